@@ -0,0 +1,13 @@
+# Builds the site as N shards in N separate processes, the way N machines
+# would, then merges them into public/: ./shards.sh [N] [extra build args]
+N=${1:-4}
+[ $# -gt 0 ] && shift
+pids=""
+for i in $(seq 0 $((N - 1))); do
+    python3 src/main.py build --shard "$i/$N" "$@" &
+    pids="$pids $!"
+done
+for pid in $pids; do
+    wait "$pid" || exit 1
+done
+python3 src/main.py merge --shard-count "$N"
@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import bench_startup
+import flatdoc
+from bench_leaf import PAGES
+from corpus import make_adversarial, make_document, make_link_adversarial, make_paragraph
+from htmlnode import LeafNode, ParentNode, escape_text
+from pagetemplate import Template
+from postprocess import Minifier
+from textnode import (
+    TextNode, TextType, classify_blocks, block_to_block_type, markdown_to_blocks,
+    markdown_to_html_node, split_nodes_delimiter, split_nodes_image, split_nodes_link,
+    text_to_textnodes,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT, 'bench_output.txt')
+DEFAULT_BASELINE = os.path.join(ROOT, 'bench_baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    # Registers a setup function returning the zero-argument callable to time
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def paragraph(words, density=0.1, nesting=0, seed=0):
+    return make_paragraph(random.Random(seed), words, density, nesting)
+
+def document(**kwargs):
+    return make_document(seed=0, **kwargs)
+
+def deep_tree(depth):
+    node = LeafNode('b', 'deep')
+    for _ in range(depth):
+        node = ParentNode('blockquote', [node])
+    return node
+
+for words, density in ((100, 0.1), (1000, 0.1), (1000, 0.5), (10000, 0.1)):
+    @benchmark(f'text_to_textnodes/words={words},density={density}')
+    def _(words=words, density=density):
+        text = paragraph(words, density)
+        return lambda: text_to_textnodes(text)
+
+@benchmark('text_to_textnodes/nesting=3')
+def _():
+    text = paragraph(1000, 0.3, nesting=3)
+    return lambda: text_to_textnodes(text)
+
+@benchmark('text_to_textnodes/adversarial')
+def _():
+    text = make_adversarial(random.Random(0), 20000)
+    return lambda: text_to_textnodes(text)
+
+@benchmark('text_to_textnodes/many_stars')
+def _():
+    text = '* a ' * 5000
+    return lambda: text_to_textnodes(text)
+
+@benchmark('text_to_textnodes/nested_runs')
+def _():
+    text = '***a** b* **c *d*** ' * 2500
+    return lambda: text_to_textnodes(text)
+
+@benchmark('text_to_textnodes/unmatched_brackets')
+def _():
+    text = '[a ' * 5000
+    return lambda: text_to_textnodes(text)
+
+@benchmark('split_nodes_delimiter/bold')
+def _():
+    nodes = [TextNode(paragraph(1000, 0.3, seed=seed), TextType.TEXT) for seed in range(10)]
+    return lambda: split_nodes_delimiter(nodes, '**', TextType.BOLD)
+
+@benchmark('split_nodes_image')
+def _():
+    nodes = [TextNode(paragraph(1000, 0.3, seed=seed), TextType.TEXT) for seed in range(10)]
+    return lambda: split_nodes_image(nodes)
+
+@benchmark('split_nodes_link')
+def _():
+    nodes = [TextNode(paragraph(1000, 0.3, seed=seed), TextType.TEXT) for seed in range(10)]
+    return lambda: split_nodes_link(nodes)
+
+@benchmark('split_nodes_link/adversarial')
+def _():
+    nodes = [TextNode(make_adversarial(random.Random(0), 2000), TextType.TEXT)]
+    return lambda: split_nodes_link(nodes)
+
+# Two sizes 10x apart, so a superlinear link scanner shows up as a ratio
+# well over 10 between them
+for length in (10000, 100000):
+    @benchmark(f'split_nodes_link/link_tokens,length={length}')
+    def _(length=length):
+        nodes = [TextNode(make_link_adversarial(random.Random(0), length), TextType.TEXT)]
+        return lambda: split_nodes_link(split_nodes_image(nodes))
+
+    @benchmark(f'text_to_textnodes/link_tokens,length={length}')
+    def _(length=length):
+        text = make_link_adversarial(random.Random(0), length)
+        return lambda: text_to_textnodes(text)
+
+for blocks in (100, 1000):
+    @benchmark(f'markdown_to_blocks/blocks={blocks}')
+    def _(blocks=blocks):
+        markdown = document(blocks=blocks)
+        return lambda: markdown_to_blocks(markdown)
+
+@benchmark('block_to_block_type/blocks=1000')
+def _():
+    blocks = markdown_to_blocks(document(blocks=1000))
+    return lambda: [block_to_block_type(block) for block in blocks]
+
+@benchmark('classify_blocks/blocks=1000')
+def _():
+    blocks = markdown_to_blocks(document(blocks=1000))
+    return lambda: classify_blocks(blocks)
+
+@benchmark('classify_blocks/lists_only')
+def _():
+    blocks = markdown_to_blocks(document(blocks=1000, block_mix={'UNORDERED_LIST': 1, 'ORDERED_LIST': 1}))
+    return lambda: classify_blocks(blocks)
+
+@benchmark('markdown_to_html_node/blocks=100')
+def _():
+    markdown = document(blocks=100)
+    return lambda: markdown_to_html_node(markdown)
+
+@benchmark('to_html/blocks=1000')
+def _():
+    node = markdown_to_html_node(document(blocks=1000))
+    return node.to_html
+
+for page in ('link-heavy', 'image-heavy'):
+    @benchmark(f'to_html/{page}')
+    def _(page=page):
+        node = markdown_to_html_node(PAGES[page])
+        return node.to_html
+
+@benchmark('flatdoc/from_markdown/blocks=100')
+def _():
+    markdown = document(blocks=100)
+    return lambda: flatdoc.from_markdown(markdown)
+
+@benchmark('flatdoc/to_html/blocks=1000')
+def _():
+    doc = flatdoc.from_markdown(document(blocks=1000))
+    return lambda: flatdoc.to_html(doc)
+
+@benchmark('template/render')
+def _():
+    with open(os.path.join(ROOT, 'template.html'), encoding='utf-8') as fp:
+        template = Template(fp.read())
+    values = {'Title': 'Generated', 'Content': markdown_to_html_node(document(blocks=100)).to_html()}
+    return lambda: template.render(values)
+
+@benchmark('minify/blocks=100')
+def _():
+    with open(os.path.join(ROOT, 'template.html'), encoding='utf-8') as fp:
+        template = Template(fp.read())
+    html = template.render({'Title': 'Generated', 'Content': markdown_to_html_node(document(blocks=100)).to_html()})
+    def run():
+        minifier = Minifier()
+        return minifier.feed(html) + minifier.flush()
+    return run
+
+@benchmark('to_html/depth=2000')
+def _():
+    node = deep_tree(2000)
+    return node.to_html
+
+@benchmark('escape_text/plain')
+def _():
+    texts = paragraph(1000).split()
+    return lambda: [escape_text(text) for text in texts]
+
+@benchmark('escape_text/special')
+def _():
+    texts = [f'{word} < {word} & "{word}"' for word in paragraph(1000).split()]
+    return lambda: [escape_text(text) for text in texts]
+
+def measure(func, min_time=0.05, repeat=5):
+    # Calibrate a loop count so each sample runs for at least min_time, then
+    # keep the best per-call time over several samples
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+def run(names=None, min_time=0.05, repeat=5):
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and not any(part in name for part in names):
+            continue
+        results[name] = {'seconds': measure(setup(), min_time, repeat)}
+    return results
+
+def compare(results, baseline, threshold):
+    # Returns (name, baseline seconds, current seconds, ratio) for every
+    # benchmark that got slower than the threshold allows
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        if ratio > 1 + threshold:
+            regressions.append((name, previous['seconds'], result['seconds'], ratio))
+    return regressions
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as fp:
+        return json.load(fp)
+
+def save_json(path, data):
+    with open(path, 'w', encoding='utf-8') as fp:
+        json.dump(data, fp, indent=1, sort_keys=True)
+        fp.write('\n')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the benchmark suite.')
+    parser.add_argument('names', nargs='*', help='only run benchmarks whose name contains one of these')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write results as JSON')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='stored results to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown against the baseline, as a fraction')
+    parser.add_argument('--update-baseline', action='store_true', help='overwrite the baseline with these results')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per sample')
+    parser.add_argument('--repeat', type=int, default=5, help='samples per benchmark')
+    parser.add_argument(
+        '--startup-budget', type=float, default=bench_startup.STARTUP_BUDGET_MS, metavar='MS',
+        help='fail if a startup/ case takes longer than MS to its first output'
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args.names, args.min_time, args.repeat)
+    # Process startup is checked against a fixed budget rather than the
+    # baseline, since it varies too much between runs for a ratio
+    startup = bench_startup.run(args.names, args.repeat)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+        'startup': startup,
+    }
+    save_json(args.output, report)
+
+    baseline = load_json(args.baseline) if os.path.exists(args.baseline) else {}
+    previous = baseline.get('results', {})
+    for name, result in results.items():
+        line = f'{name:<50} {result["seconds"] * 1e6:>12.1f} us'
+        if name in previous:
+            line += f' {result["seconds"] / previous[name]["seconds"]:>6.2f}x'
+        print(line)
+    for name, result in startup.items():
+        print(f'{name:<50} {result["seconds"] * 1000:>12.1f} ms, imports {result["import_seconds"] * 1000:.1f} ms')
+    over_budget = bench_startup.over_budget(startup, args.startup_budget)
+    for name, milliseconds in over_budget:
+        print(f'OVER BUDGET {name}: {milliseconds:.1f} ms > {args.startup_budget:g} ms')
+
+    if args.update_baseline:
+        save_json(args.baseline, report)
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for name, old, new, ratio in regressions:
+        print(f'REGRESSION {name}: {old * 1e6:.1f} us -> {new * 1e6:.1f} us ({ratio:.2f}x)')
+    return 1 if regressions or over_budget else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
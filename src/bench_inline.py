@@ -0,0 +1,26 @@
+import random
+import time
+
+from corpus import make_paragraph
+from textnode import text_to_textnodes_multipass, tokenize_inline
+
+def time_func(func, text, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    rng = random.Random(0)
+    print(f'{"words":>8} {"density":>8} {"multipass ms":>14} {"single ms":>12} {"speedup":>8}')
+    for words in (10, 100, 1000, 10000):
+        for density in (0.0, 0.1, 0.5):
+            text = make_paragraph(rng, words, density)
+            old = time_func(text_to_textnodes_multipass, text)
+            new = time_func(tokenize_inline, text)
+            print(f'{words:>8} {density:>8} {old * 1000:>14.3f} {new * 1000:>12.3f} {old / new:>7.1f}x')
+
+if __name__ == '__main__':
+    main()
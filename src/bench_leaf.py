@@ -0,0 +1,65 @@
+import random
+import time
+
+from corpus import make_paragraph
+from htmlnode import LeafNode
+from textnode import markdown_to_html_node
+
+def props_to_html(props):
+    if not isinstance(props, dict):
+        return ''
+    return ''.join([f' {key}="{value}"' for key, value in props.items()])
+
+def leaf_to_html_before(node):
+    # LeafNode.to_html as it was before tag strings were precomputed
+    if node.value is None:
+        raise ValueError('LeafNode.value should not be None')
+    if node.tag is None:
+        return node.value
+    return f'<{node.tag}{props_to_html(node.props)}>{node.value}</{node.tag}>'
+
+def collect_leaves(node, leaves):
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, LeafNode):
+            leaves.append(item)
+        else:
+            stack.extend(item.children)
+    return leaves
+
+def make_page(markup):
+    rng = random.Random(0)
+    paragraphs = []
+    for _ in range(200):
+        words = make_paragraph(rng, 40, 0).split()
+        for idx in range(0, len(words), 2):
+            words[idx] = markup(words[idx])
+        paragraphs.append(' '.join(words))
+    return '\n\n'.join(paragraphs)
+
+PAGES = {
+    'link-heavy': make_page(lambda word: f'[{word}](https://example.com/{word})'),
+    'image-heavy': make_page(lambda word: f'![{word}](/images/{word}.png)'),
+    'emphasis-heavy': make_page(lambda word: f'**{word}**'),
+}
+
+def best_of(func, leaves, repeat=7):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for leaf in leaves:
+            func(leaf)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    print(f'{"page":<16} {"leaves":>7} {"before ms":>10} {"after ms":>9} {"speedup":>8}')
+    for name, markdown in PAGES.items():
+        leaves = collect_leaves(markdown_to_html_node(markdown), [])
+        before = best_of(leaf_to_html_before, leaves)
+        after = best_of(LeafNode.to_html, leaves)
+        print(f'{name:<16} {len(leaves):>7} {before * 1000:>10.3f} {after * 1000:>9.3f} {before / after:>7.2f}x')
+
+if __name__ == '__main__':
+    main()
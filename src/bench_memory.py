@@ -0,0 +1,160 @@
+import gc
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import flatdoc
+from build import render_page_file
+from corpus import make_document
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType, markdown_to_html_node
+
+# Copies of the node classes as they were before __slots__, for comparison
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        if children is not None:
+            self.children = children[:]
+        else:
+            self.children = children
+        if props is not None:
+            self.props = props.copy()
+        else:
+            self.props = props
+
+class DictLeafNode(DictHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag=tag, value=value, children=None, props=props)
+
+class DictParentNode(DictHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag=tag, value=None, children=children, props=props)
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+COUNT = 100000
+TEXT = 'some text'
+URL = 'https://example.com'
+
+CASES = [
+    ('TextNode', lambda: DictTextNode(TEXT, TextType.LINK, URL), lambda: TextNode(TEXT, TextType.LINK, URL)),
+    ('LeafNode', lambda: DictLeafNode('b', TEXT), lambda: LeafNode('b', TEXT)),
+    (
+        'LeafNode+props',
+        lambda: DictLeafNode('a', TEXT, {'href': URL}),
+        lambda: LeafNode._owned('a', TEXT, props={'href': URL}),
+    ),
+    (
+        'ParentNode',
+        lambda: DictParentNode('p', [None, None, None]),
+        lambda: ParentNode._owned('p', [None, None, None]),
+    ),
+]
+
+def bytes_per_node(factory):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    nodes = [factory() for _ in range(COUNT)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    # Exclude the list holding the nodes
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    total -= nodes.__sizeof__()
+    return total / COUNT
+
+def retained(build):
+    # Bytes and GC-tracked objects still held by build()'s result
+    gc.collect()
+    objects = len(gc.get_objects())
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    objects = len(gc.get_objects()) - objects
+    del result
+    return size, objects
+
+def document_memory(blocks=2000):
+    markdown = make_document(seed=0, blocks=blocks, nesting=2)
+    print(f'\n{"document":<10} {"MB":>8} {"GC objects":>11}   ({len(markdown) / 1e6:.1f} MB markdown)')
+    for name, build in (
+        ('HTMLNode', lambda: markdown_to_html_node(markdown)),
+        ('flatdoc', lambda: flatdoc.from_markdown(markdown)),
+    ):
+        size, objects = retained(build)
+        print(f'{name:<10} {size / 1e6:>8.2f} {objects:>11}')
+
+RENDER_SIZES_MB = (4, 16, 64)
+
+def write_large_document(path, megabytes):
+    # One generated document repeated, with only the first copy's title
+    document = make_document(seed=0, blocks=1000)
+    body = document.split('\n\n', 1)[1]
+    with open(path, 'w', encoding='utf-8') as fp:
+        fp.write('# Large\n\n')
+        size = 0
+        while size < megabytes * 1024 * 1024:
+            fp.write(body)
+            fp.write('\n\n')
+            size += len(body) + 2
+
+def high_water_mb():
+    # VmHWM belongs to this address space. ru_maxrss is the fallback, but on
+    # Linux it keeps the parent's peak across fork and exec.
+    try:
+        with open('/proc/self/status', encoding='ascii') as fp:
+            for line in fp:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def peak_rss(task):
+    # Runs in a fresh process
+    source_path, stream = task
+    if source_path is not None:
+        output_path = source_path + '.html'
+        render_page_file(source_path, output_path, '<title>{{ Title }}</title>{{ Content }}', stream)
+        os.remove(output_path)
+    return high_water_mb()
+
+def measure_peak(source_path, stream):
+    # A spawned single-use worker, so each run starts from a clean heap
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(peak_rss, (source_path, stream)).result()
+
+def render_memory(sizes):
+    print(f'\npeak RSS rendering one page, idle worker {measure_peak(None, False):.1f} MB')
+    print(f'{"input MB":>9} {"in-memory MB":>13} {"streamed MB":>12}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for megabytes in sizes:
+            path = os.path.join(tmp, f'{megabytes}.md')
+            write_large_document(path, megabytes)
+            whole = measure_peak(path, False)
+            streamed = measure_peak(path, True)
+            print(f'{megabytes:>9} {whole:>13.1f} {streamed:>12.1f}')
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    print(f'{"node":<16} {"before B/node":>14} {"after B/node":>13} {"saved":>7}')
+    for name, old, new in CASES:
+        old_bytes = bytes_per_node(old)
+        new_bytes = bytes_per_node(new)
+        saved = 1 - new_bytes / old_bytes
+        print(f'{name:<16} {old_bytes:>14.1f} {new_bytes:>13.1f} {saved:>6.0%}')
+    document_memory()
+    render_memory([int(size) for size in argv] or RENDER_SIZES_MB)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from sitefixture import write_site
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'src', 'main.py')
+
+# Wall time from starting the interpreter to the CLI's first line of output
+STARTUP_BUDGET_MS = 50
+
+# Modules that --help and a build with nothing to render should never load
+HEAVY_MODULES = ('textnode', 'fragmentcache', 'concurrent.futures', 'multiprocessing')
+
+CASES = {
+    'startup/help': ['--help'],
+    'startup/build-unchanged': ['build'],
+}
+
+def startup_env():
+    # Bytecode caching on, as for anyone running the CLI, so compiling the
+    # sources isn't part of what is measured
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+def parse_importtime(stderr):
+    # Lines look like 'import time:  self | cumulative | <indent>name', two
+    # spaces of indent per level. Returns {module: cumulative microseconds}
+    # and the total over top-level imports.
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        modules[name.strip()] = int(cumulative)
+        if len(name) - len(name.lstrip()) == 1:
+            total += int(cumulative)
+    return modules, total
+
+def run_cli(args, cwd, importtime=False):
+    # Returns seconds until the first line on stdout, and stderr
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + [MAIN] + args
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=cwd, env=startup_env(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    _, stderr = process.communicate()
+    if process.returncode:
+        raise RuntimeError(f'{" ".join(args)} exited with {process.returncode}: {stderr[-500:]}')
+    return elapsed, stderr
+
+def measure(args, cwd, repeat=5):
+    # Best time to first output over repeat runs, plus one -X importtime run
+    # for the import breakdown, which timing every import would slow down
+    run_cli(args, cwd)
+    best = min(run_cli(args, cwd)[0] for _ in range(repeat))
+    modules, total = parse_importtime(run_cli(args, cwd, importtime=True)[1])
+    heavy = sorted(
+        name for name in modules
+        if any(name == module or name.startswith(module + '.') for module in HEAVY_MODULES)
+    )
+    return {'seconds': best, 'import_seconds': total / 1e6, 'heavy': heavy}
+
+def run(names=None, repeat=5):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        write_site(tmp)
+        for name, args in CASES.items():
+            if names and not any(part in name for part in names):
+                continue
+            results[name] = measure(args, tmp, repeat)
+    return results
+
+def over_budget(results, budget_ms):
+    # Returns (name, milliseconds) for every case slower than the budget
+    return [(name, result['seconds'] * 1000) for name, result in results.items()
+            if result['seconds'] * 1000 > budget_ms]
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    results = run(argv)
+    for name, result in results.items():
+        print(f'{name:<30} {result["seconds"] * 1000:>7.1f} ms, imports {result["import_seconds"] * 1000:.1f} ms')
+        for module in result['heavy']:
+            print(f'  loads {module}')
+    failures = over_budget(results, STARTUP_BUDGET_MS)
+    for name, milliseconds in failures:
+        print(f'OVER BUDGET {name}: {milliseconds:.1f} ms > {STARTUP_BUDGET_MS} ms')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
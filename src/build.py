@@ -0,0 +1,400 @@
+import hashlib
+import json
+import os
+import shutil
+
+# The renderer and the fragment cache are imported where they're used, so a
+# build with nothing to render never loads them
+import linkindex
+import postprocess
+import rendercache
+import toc
+from linkindex import LinkIndex
+from htmlnode import escape_text
+from pagetemplate import as_template, load_template
+
+MANIFEST_VERSION = 2
+# Postprocess settings assumed for manifests written before they were recorded
+POSTPROCESS_OFF = {'minify': False, 'precompress': False}
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path, previous=None):
+    # Reuse the recorded hash when size and mtime haven't moved, so an
+    # unchanged tree is checked with stat() alone
+    stat = os.stat(path)
+    if (previous is not None
+            and previous.get('mtime') == stat.st_mtime_ns
+            and previous.get('size') == stat.st_size):
+        return previous['hash'], stat
+    with open(path, 'rb') as fp:
+        return hash_bytes(fp.read()), stat
+
+def list_files(root):
+    # Relative '/'-separated paths, sorted so builds are deterministic
+    files = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            files.append(os.path.relpath(path, root).replace(os.sep, '/'))
+    files.sort()
+    return files
+
+def shard_of(source, count):
+    # Stable across processes and machines, unlike hash(), which is salted
+    # per process
+    digest = hashlib.sha256(source.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+def page_output_path(source):
+    root, _ = os.path.splitext(source)
+    return root + '.html'
+
+def render_page(markdown, template):
+    # template is a pagetemplate.Template or template text. Headings get id
+    # anchors and a table of contents for the template's TOC slot.
+    from textnode import extract_title, markdown_to_html_node
+    title = escape_text(extract_title(markdown))
+    toc.start()
+    try:
+        content = markdown_to_html_node(markdown).to_html()
+    finally:
+        headings = toc.finish()
+    template = as_template(template)
+    values = {'Title': title, 'Content': content}
+    if 'TOC' in template.slots:
+        values['TOC'] = headings.to_html()
+    return template.render(values)
+
+def page_hash(html):
+    # Identifies a page's output file: its HTML and the postprocess settings
+    # applied on the way to disk
+    digest = hashlib.blake2b(repr(postprocess.settings).encode('utf-8'), digest_size=16)
+    digest.update(html.encode('utf-8'))
+    return digest.hexdigest()
+
+def iter_toc_html():
+    # Evaluated when the template reaches its TOC slot, which can_stream
+    # makes sure comes after all of the content
+    yield toc.current.to_html()
+
+def can_stream(template):
+    # A streamed page only knows its headings once its content is written,
+    # so a template with a TOC slot before Content, or without Content,
+    # has to be rendered in memory
+    slots = as_template(template).slots
+    if 'TOC' not in slots:
+        return True
+    if 'Content' not in slots:
+        return False
+    last_content = len(slots) - 1 - slots[::-1].index('Content')
+    return slots.index('TOC') > last_content
+
+def render_page_stream(source_path, fp, template):
+    # Writes the page to fp block by block instead of building it in memory,
+    # so peak memory follows the largest block rather than the document
+    from textnode import extract_title, iter_markdown_html
+    if not can_stream(template):
+        raise ValueError('the template has a TOC slot before its Content, render the page in memory')
+    with open(source_path, 'r', encoding='utf-8') as source:
+        title = escape_text(extract_title(source))
+        source.seek(0)
+        toc.start()
+        try:
+            values = {'Title': title, 'Content': iter_markdown_html(source), 'TOC': iter_toc_html()}
+            as_template(template).write(fp, values)
+        finally:
+            toc.finish()
+
+def read_source(path):
+    with open(path, 'r', encoding='utf-8') as fp:
+        return fp.read()
+
+def render_page_file(source_path, output_path, template, stream=False, previous_hash=None):
+    # Returns the (kind, target) links and images found while rendering, and
+    # the page's page_hash(). previous_hash is the hash of the page already
+    # at output_path, if any: a page that hashes the same isn't written, so
+    # the file and its mtime are left alone. Streamed pages aren't hashed and
+    # are always written; a template that can't stream renders in memory.
+    stream = stream and can_stream(template)
+    linkindex.start()
+    html_hash = None
+    try:
+        if not stream:
+            html = render_page(read_source(source_path), template)
+            html_hash = page_hash(html)
+        if html_hash is not None and html_hash == previous_hash:
+            # Same output as the file already there
+            pass
+        elif postprocess.settings is not None:
+            with postprocess.PageWriter(output_path) as fp:
+                if stream:
+                    render_page_stream(source_path, fp, template)
+                else:
+                    fp.write(html)
+        elif stream:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, 'w', encoding='utf-8') as fp:
+                render_page_stream(source_path, fp, template)
+        else:
+            write_output(output_path, html)
+    finally:
+        links = linkindex.finish()
+    return links, html_hash
+
+# Set once per worker process by init_worker so the compiled template is
+# pickled once per worker rather than with every task
+worker_template = None
+worker_profile = False
+
+def enable_caches(cache_size, fragment_cache, post=None):
+    if post is not None:
+        postprocess.enable(**post)
+    if cache_size:
+        rendercache.enable(cache_size)
+    if fragment_cache is not None:
+        from fragmentcache import FragmentCache
+        directory, max_bytes = fragment_cache
+        rendercache.enable_disk(FragmentCache(directory, rendercache.RENDERER_VERSION, max_bytes))
+
+def init_worker(template, cache_size, fragment_cache, profile, post):
+    global worker_template, worker_profile
+    worker_template = template
+    worker_profile = profile
+    enable_caches(cache_size, fragment_cache, post)
+    if profile:
+        # Imported here because profiler wraps functions in this module.
+        # Reinstall so a forked worker doesn't inherit the parent's counters.
+        import profiler
+        profiler.uninstall()
+        profiler.install()
+
+def render_task(task):
+    source_path, output_path, stream, previous_hash = task
+    page = render_page_file(source_path, output_path, worker_template, stream, previous_hash)
+    profile = None
+    if worker_profile:
+        import profiler
+        profile = profiler.snapshot()
+    return os.getpid(), {'cache': rendercache.stats(), 'profile': profile, 'post': postprocess.stats()}, page
+
+def render_pages(tasks, template, jobs=1, cache_size=0, fragment_cache=None, profile=False, post=None):
+    # Workers write their pages directly; only the task paths, links and
+    # counters cross the process boundary. fragment_cache is a (directory,
+    # max_bytes) pair or None, post the postprocess.enable() settings or
+    # None, so minifying and compressing a page happen in the worker that
+    # rendered it. Tasks are (source_path, output_path, stream,
+    # previous_hash). Returns cache and postprocess stats, profile snapshots
+    # and each task's (links, page hash).
+    if jobs <= 1 or len(tasks) <= 1:
+        enable_caches(cache_size, fragment_cache, post)
+        try:
+            pages = [
+                render_page_file(source_path, output_path, template, stream, previous_hash)
+                for source_path, output_path, stream, previous_hash in tasks
+            ]
+            return {
+                'cache': rendercache.merge_stats([rendercache.stats()]),
+                'profiles': [],
+                'post': postprocess.stats(),
+                'pages': pages,
+            }
+        finally:
+            if cache_size or fragment_cache is not None:
+                rendercache.disable()
+            postprocess.disable()
+    # Imported here since it costs more than the rest of the build's imports
+    # together, and serial and no-op builds never start a pool
+    from concurrent.futures import ProcessPoolExecutor
+    jobs = min(jobs, len(tasks))
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    latest = {}
+    pages = []
+    initargs = (template, cache_size, fragment_cache, profile, post)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=initargs) as executor:
+        for pid, stats, page in executor.map(render_task, tasks, chunksize=chunksize):
+            # Counters are cumulative per worker, so keep the latest from each
+            latest[pid] = stats
+            pages.append(page)
+    return {
+        'cache': rendercache.merge_stats(stats['cache'] for stats in latest.values()),
+        'profiles': [stats['profile'] for stats in latest.values()],
+        'post': postprocess.merge_stats(stats['post'] for stats in latest.values()),
+        'pages': pages,
+    }
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as fp:
+            manifest = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def save_manifest(path, manifest):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fp:
+        json.dump(manifest, fp, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def write_output(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as fp:
+        fp.write(data)
+
+def remove_output(public_dir, output):
+    path = os.path.join(public_dir, output)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    # Prune directories left empty, stopping at public_dir
+    directory = os.path.dirname(path)
+    while os.path.abspath(directory) != os.path.abspath(public_dir):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+def remove_precompressed(public_dir, entries):
+    for item in entries:
+        remove_output(public_dir, item['output'] + '.gz')
+
+def entry(file_hash, stat, output):
+    return {'hash': file_hash, 'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'output': output}
+
+def is_fresh(previous, file_hash, public_dir):
+    return (previous is not None
+            and previous['hash'] == file_hash
+            and os.path.exists(os.path.join(public_dir, previous['output'])))
+
+def build_site(content_dir, static_dir, template_path, public_dir, manifest_path, jobs=1, cache_size=0,
+               fragment_cache=None, profile=False, check_links=False, stream_bytes=None, shard=None,
+               minify=False, precompress=False):
+    # Pages of at least stream_bytes are rendered block by block with
+    # render_page_stream instead of in memory. shard is an (index, count)
+    # pair: only sources with shard_of(source, count) == index are built,
+    # and shards.merge_shards combines the results. minify and precompress
+    # minify each page and write a .gz next to it, see postprocess. Rendered
+    # pages whose output didn't change are listed in stats['unchanged'] too,
+    # and left as they were on disk.
+    if shard is not None and check_links:
+        raise ValueError('a shard only sees its own pages, check links when merging')
+    old_manifest = load_manifest(manifest_path) or {}
+    old_pages = old_manifest.get('pages', {})
+    old_static = old_manifest.get('static', {})
+    stats = {
+        'rendered': [], 'unchanged': [], 'copied': [], 'skipped': 0, 'deleted': [],
+        'cache': {}, 'profiles': [], 'post': None,
+    }
+    index = stats['links'] = LinkIndex()
+
+    template_hash, template_stat = hash_file(template_path, old_manifest.get('template'))
+    template_changed = template_hash != old_manifest.get('template', {}).get('hash')
+    if old_manifest.get('renderer') != rendercache.RENDERER_VERSION:
+        # Pages rendered by another renderer version may render differently
+        template_changed = True
+    post = {'minify': minify, 'precompress': precompress}
+    old_post = old_manifest.get('postprocess', POSTPROCESS_OFF)
+    if post != old_post:
+        # Every page's output changes, like a template change
+        template_changed = True
+        if old_post['precompress'] and not precompress:
+            remove_precompressed(public_dir, old_pages.values())
+    tasks = []
+
+    pages = {}
+    for source in list_files(content_dir):
+        if not source.endswith('.md'):
+            continue
+        if shard is not None and shard_of(source, shard[1]) != shard[0]:
+            continue
+        path = os.path.join(content_dir, source)
+        previous = old_pages.get(source)
+        file_hash, stat = hash_file(path, previous)
+        output = page_output_path(source)
+        output_path = os.path.join(public_dir, output)
+        pages[source] = entry(file_hash, stat, output)
+        written = (previous is not None and os.path.exists(output_path)
+                   and (not precompress or os.path.exists(output_path + '.gz')))
+        if written and not template_changed and previous['hash'] == file_hash:
+            # Unchanged pages keep the links and hash recorded when they were
+            # rendered
+            pages[source]['links'] = previous['links']
+            if 'html_hash' in previous:
+                pages[source]['html_hash'] = previous['html_hash']
+            index.set_links(source, previous['links'])
+            stats['skipped'] += 1
+            continue
+        stream = stream_bytes is not None and stat.st_size >= stream_bytes
+        # A page that renders to the output already there isn't rewritten
+        previous_hash = previous.get('html_hash') if written else None
+        tasks.append((path, output_path, stream, previous_hash))
+        stats['rendered'].append(source)
+
+    if tasks:
+        template = load_template(template_path)
+        result = render_pages(tasks, template, jobs, cache_size, fragment_cache, profile, post if minify or precompress else None)
+        stats['cache'] = result['cache']
+        stats['profiles'] = result['profiles']
+        stats['post'] = result['post']
+        for source, task, (links, html_hash) in zip(stats['rendered'], tasks, result['pages']):
+            pages[source]['links'] = links
+            index.set_links(source, links)
+            if html_hash is not None:
+                pages[source]['html_hash'] = html_hash
+                if html_hash == task[3]:
+                    stats['unchanged'].append(source)
+    if fragment_cache is not None and stats['cache'].get('disk', {}).get('writes'):
+        # Only writes grow the cache, and walking it costs a stat() per
+        # fragment, so builds that wrote none skip eviction
+        from fragmentcache import FragmentCache
+        directory, max_bytes = fragment_cache
+        FragmentCache(directory, rendercache.RENDERER_VERSION, max_bytes).evict()
+
+    static = {}
+    for source in list_files(static_dir):
+        if shard is not None and shard_of(source, shard[1]) != shard[0]:
+            continue
+        path = os.path.join(static_dir, source)
+        previous = old_static.get(source)
+        file_hash, stat = hash_file(path, previous)
+        static[source] = entry(file_hash, stat, source)
+        if is_fresh(previous, file_hash, public_dir):
+            stats['skipped'] += 1
+            continue
+        destination = os.path.join(public_dir, source)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copy2(path, destination)
+        stats['copied'].append(source)
+
+    current_outputs = {item['output'] for item in pages.values()}
+    current_outputs.update(item['output'] for item in static.values())
+    for old_entries, new_entries in ((old_pages, pages), (old_static, static)):
+        for source, item in old_entries.items():
+            if source not in new_entries and item['output'] not in current_outputs:
+                remove_output(public_dir, item['output'])
+                stats['deleted'].append(item['output'])
+                if old_entries is old_pages and old_post['precompress']:
+                    remove_precompressed(public_dir, [item])
+
+    if check_links:
+        source_outputs = {source: item['output'] for source, item in pages.items()}
+        stats['broken'] = index.check(current_outputs, source_outputs)
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'template': entry(template_hash, template_stat, None),
+        'renderer': rendercache.RENDERER_VERSION,
+        'pages': pages,
+        'static': static,
+        'postprocess': post,
+    }
+    if shard is not None:
+        manifest['shard'] = {'index': shard[0], 'count': shard[1]}
+    save_manifest(manifest_path, manifest)
+    return stats
@@ -0,0 +1,109 @@
+import os
+import random
+
+WORDS = [
+    'lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit',
+    'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore',
+]
+
+INLINE_MARKUP = [
+    lambda word: f'**{word}**',
+    lambda word: f'*{word}*',
+    lambda word: f'`{word}`',
+    lambda word: f'[{word}](https://example.com/{word})',
+    lambda word: f'![{word}](https://example.com/{word}.png)',
+]
+
+DEFAULT_BLOCK_MIX = {
+    'PARAGRAPH': 6,
+    'HEADING': 1,
+    'CODE': 1,
+    'QUOTE': 1,
+    'UNORDERED_LIST': 1,
+    'ORDERED_LIST': 1,
+}
+
+# Characters that start or end inline markup, used unmatched
+ADVERSARIAL_TOKENS = ['*', '**', '`', '[', ']', '(', ')', '!', '![', '](']
+
+# Link and image fragments, mostly broken, for fuzzing the link scanners
+LINK_TOKENS = ['[', ']', '(', ')', '!', '![', '](', '[a](b)', '![a](b)', '[a]', '(b)', ')(', '!!', '][']
+
+def make_paragraph(rng, words, density=0.1, nesting=0):
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        if rng.random() < density:
+            word = rng.choice(INLINE_MARKUP)(word)
+            if nesting:
+                word = make_nested(word, nesting)
+        parts.append(word)
+    return ' '.join(parts)
+
+def make_nested(word, depth):
+    # Alternate italic and bold around the word, italic innermost: *word* at
+    # depth 1, ***word*** at depth 2
+    for level in range(depth):
+        delimiter = '*' if level % 2 == 0 else '**'
+        word = f'{delimiter}{word}{delimiter}'
+    return word
+
+def make_adversarial(rng, length, tokens=None):
+    tokens = tokens or ADVERSARIAL_TOKENS
+    parts = []
+    size = 0
+    while size < length:
+        part = rng.choice(tokens) if rng.random() < 0.5 else rng.choice(WORDS)
+        parts.append(part)
+        size += len(part) + 1
+    return ' '.join(parts)
+
+def make_link_adversarial(rng, length):
+    # Link tokens run together without spaces, so fragments combine into
+    # near misses like [a]](b) and ![(a)](b
+    parts = []
+    size = 0
+    while size < length:
+        part = rng.choice(LINK_TOKENS) if rng.random() < 0.8 else rng.choice(WORDS)
+        parts.append(part)
+        size += len(part)
+    return ''.join(parts)
+
+def make_block(rng, block_type, words, density, nesting):
+    line_words = max(1, words // 4)
+    match block_type:
+        case 'HEADING':
+            return '#' * rng.randint(1, 6) + ' ' + make_paragraph(rng, line_words, density)
+        case 'CODE':
+            lines = [make_paragraph(rng, line_words, 0) for _ in range(4)]
+            return '```\n' + '\n'.join(lines) + '\n```'
+        case 'QUOTE':
+            return '\n'.join('> ' + make_paragraph(rng, line_words, density, nesting) for _ in range(4))
+        case 'UNORDERED_LIST':
+            return '\n'.join('* ' + make_paragraph(rng, line_words, density, nesting) for _ in range(4))
+        case 'ORDERED_LIST':
+            return '\n'.join(
+                f'{number}. ' + make_paragraph(rng, line_words, density, nesting)
+                for number in range(1, 5)
+            )
+        case _:
+            lines = [make_paragraph(rng, line_words, density, nesting) for _ in range(4)]
+            return '\n'.join(lines)
+
+def make_document(seed=0, blocks=100, words=40, density=0.1, nesting=0, block_mix=None, title='Generated'):
+    rng = random.Random(seed)
+    block_mix = block_mix or DEFAULT_BLOCK_MIX
+    types = list(block_mix)
+    weights = [block_mix[block_type] for block_type in types]
+    parts = [f'# {title}']
+    for block_type in rng.choices(types, weights, k=blocks):
+        parts.append(make_block(rng, block_type, words, density, nesting))
+    return '\n\n'.join(parts)
+
+def write_corpus(content_dir, pages, seed=0, **kwargs):
+    # Writes pages/<n>.md files with documents derived from one seed
+    for page in range(pages):
+        path = os.path.join(content_dir, 'pages', f'{page}.md')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as fp:
+            fp.write(make_document(seed=seed * 1000003 + page, title=f'Page {page}', **kwargs))
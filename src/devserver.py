@@ -0,0 +1,158 @@
+import mimetypes
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from build import page_output_path, read_source, render_page
+from linkindex import url_candidates
+from pagetemplate import load_template
+
+def scan(root):
+    # Maps relative path -> (mtime_ns, size) for every file under root
+    found = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            found[os.path.relpath(path, root).replace(os.sep, '/')] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+class DevSite:
+    # Rendered pages and static files held in memory, refreshed by comparing
+    # mtimes against the last scan
+    def __init__(self, content_dir, static_dir, template_path):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.lock = threading.Lock()
+        self.files = {}
+        self.content_mtimes = {}
+        self.static_mtimes = {}
+        self.template = None
+
+    def get(self, path):
+        with self.lock:
+            return self.files.get(path)
+
+    def refresh(self):
+        # Returns the output paths that changed since the last refresh
+        changed = []
+        # load_template recompiles only when the file's mtime or size moved
+        try:
+            template = load_template(self.template_path)
+        except (OSError, ValueError) as error:
+            # Editors that save by renaming leave no template for a moment;
+            # keep rendering with the last good one
+            if self.template is None:
+                raise
+            print(f'error loading template {self.template_path}: {error}', file=sys.stderr)
+            template = self.template
+        template_changed = template is not self.template
+        self.template = template
+
+        content = {source: mtime for source, mtime in scan(self.content_dir).items() if source.endswith('.md')}
+        for source, mtime in content.items():
+            if not template_changed and self.content_mtimes.get(source) == mtime:
+                continue
+            output = page_output_path(source)
+            try:
+                html = render_page(read_source(os.path.join(self.content_dir, source)), self.template)
+            except (OSError, ValueError) as error:
+                # Keep serving the last good version while the file is mid-edit
+                print(f'error rendering {source}: {error}', file=sys.stderr)
+                self.content_mtimes[source] = mtime
+                continue
+            with self.lock:
+                self.files[output] = html.encode('utf-8')
+            self.content_mtimes[source] = mtime
+            changed.append(output)
+        for source in set(self.content_mtimes) - set(content):
+            del self.content_mtimes[source]
+            self.remove(page_output_path(source), changed)
+
+        static = scan(self.static_dir)
+        for source, mtime in static.items():
+            if self.static_mtimes.get(source) == mtime:
+                continue
+            try:
+                with open(os.path.join(self.static_dir, source), 'rb') as fp:
+                    data = fp.read()
+            except OSError:
+                continue
+            with self.lock:
+                self.files[source] = data
+            self.static_mtimes[source] = mtime
+            changed.append(source)
+        for source in set(self.static_mtimes) - set(static):
+            del self.static_mtimes[source]
+            self.remove(source, changed)
+        return changed
+
+    def remove(self, path, changed):
+        with self.lock:
+            self.files.pop(path, None)
+        changed.append(path)
+
+def resolve(url_path):
+    # Maps a request path to the output paths it may have in public/
+    return url_candidates(unquote(urlsplit(url_path).path))
+
+def make_handler(site):
+    class DevHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            for path in resolve(self.path):
+                data = site.get(path)
+                if data is not None:
+                    break
+            else:
+                self.send_error(404)
+                return
+            content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            if content_type.startswith('text/'):
+                content_type += '; charset=utf-8'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+    return DevHandler
+
+def watch(site, interval, stop):
+    while not stop.wait(interval):
+        start = time.perf_counter()
+        try:
+            changed = site.refresh()
+        except Exception as error:
+            # One failed pass mustn't end the thread and with it every
+            # later rebuild
+            print(f'error refreshing: {error!r}', file=sys.stderr)
+            continue
+        if changed:
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f'rebuilt {len(changed)} file(s) in {elapsed:.1f} ms: {", ".join(changed[:5])}')
+
+def serve(content_dir, static_dir, template_path, host='127.0.0.1', port=8888, watch_changes=False, interval=0.05):
+    site = DevSite(content_dir, static_dir, template_path)
+    site.refresh()
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    stop = threading.Event()
+    if watch_changes:
+        threading.Thread(target=watch, args=(site, interval, stop), daemon=True).start()
+    print(f'serving on http://{host}:{server.server_address[1]}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
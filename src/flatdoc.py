@@ -0,0 +1,342 @@
+import array
+
+from htmlnode import (
+    TAG_STRINGS, LeafNode, ParentNode, RawNode, SafeLeafNode, escape_attribute, escape_text, tag_strings,
+)
+from textnode import EmphasisNode, TextNode, TextType, block_to_html_node, classify_block
+
+# Node kinds. SAFE is TEXT whose value and props were checked at build time
+# to contain nothing to escape.
+ELEMENT = 0
+TEXT = 1
+SAFE = 2
+RAW = 3
+
+NONE = -1
+
+# How far past the last located text to look for the next one in the source
+LOCATE_WINDOW = 512
+
+TEXT_TYPE_TAGS = {
+    TextType.TEXT: None,
+    TextType.BOLD: 'b',
+    TextType.ITALIC: 'i',
+    TextType.CODE: 'code',
+    TextType.LINK: 'a',
+    TextType.IMAGE: 'img',
+}
+TAG_TEXT_TYPES = {tag: text_type for text_type, tag in TEXT_TYPE_TAGS.items()}
+
+class FlatDocument:
+    # A tree stored as parallel arrays indexed by node number in document
+    # order, so a page is a handful of objects instead of one per element,
+    # string and props dict. Text and prop values are (start, end) offsets:
+    # below len(source) they slice the original source, above it they slice
+    # extra, which holds text that wasn't found in the source. Nodes without
+    # a parent are top-level siblings, node 0 the first of them.
+    def __init__(self, source=''):
+        self.source = source
+        self.extra = ''
+        # Tag and prop names by id, 0 is no tag
+        self.names = [None]
+        self.kind = array.array('B')
+        self.tag = array.array('H')
+        self.parent = array.array('i')
+        self.first_child = array.array('i')
+        self.next_sibling = array.array('i')
+        self.start = array.array('q')
+        self.end = array.array('q')
+        # Props of node n are prop_* entries prop_first[n]:prop_first[n] + prop_count[n]
+        self.prop_first = array.array('i')
+        self.prop_count = array.array('I')
+        self.prop_name = array.array('H')
+        self.prop_start = array.array('q')
+        self.prop_end = array.array('q')
+
+    def __len__(self):
+        return len(self.kind)
+
+    def text(self, start, end):
+        split = len(self.source)
+        if start >= split:
+            return self.extra[start - split:end - split]
+        return self.source[start:end]
+
+    def props(self, node):
+        count = self.prop_count[node]
+        if not count:
+            return None
+        first = self.prop_first[node]
+        return {
+            self.names[self.prop_name[index]]: self.text(self.prop_start[index], self.prop_end[index])
+            for index in range(first, first + count)
+        }
+
+    def children(self, node):
+        child = self.first_child[node]
+        while child != NONE:
+            yield child
+            child = self.next_sibling[child]
+
+def is_clean(text):
+    return '&' not in text and '<' not in text and '>' not in text and '"' not in text
+
+class FlatBuilder:
+    # Appends nodes to a FlatDocument in document order. Text found near the
+    # last located text in the source becomes a span into it; anything else
+    # is copied once into the document's extra buffer.
+    def __init__(self, source=''):
+        self.doc = FlatDocument(source)
+        self.name_ids = {None: 0}
+        self.last_child = array.array('i')
+        self.last_top = NONE
+        self.extra = []
+        self.extra_size = len(source)
+        self.anchor = 0
+
+    def name_id(self, name):
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.doc.names)
+            self.doc.names.append(name)
+        return name_id
+
+    def span(self, text, advance=True):
+        if not text:
+            return 0, 0
+        source = self.doc.source
+        found = source.find(text, self.anchor, self.anchor + len(text) + LOCATE_WINDOW)
+        if found != -1:
+            if advance:
+                self.anchor = found + len(text)
+            return found, found + len(text)
+        start = self.extra_size
+        self.extra.append(text)
+        self.extra_size += len(text)
+        return start, self.extra_size
+
+    def add(self, kind, tag, parent, text='', props=None):
+        doc = self.doc
+        node = len(doc.kind)
+        # Values are stored as text, str() of anything else, as escape_text does
+        if type(text) is not str:
+            text = str(text)
+        if props and not all(type(value) is str for value in props.values()):
+            props = {name: value if type(value) is str else str(value) for name, value in props.items()}
+        if kind == TEXT and is_clean(text) and (not props or all(is_clean(value) for value in props.values())):
+            kind = SAFE
+        start, end = self.span(text)
+        doc.kind.append(kind)
+        doc.tag.append(self.name_id(tag))
+        doc.parent.append(parent)
+        doc.first_child.append(NONE)
+        doc.next_sibling.append(NONE)
+        doc.start.append(start)
+        doc.end.append(end)
+        self.last_child.append(NONE)
+        doc.prop_first.append(len(doc.prop_name))
+        doc.prop_count.append(len(props) if props else 0)
+        if props:
+            for name, value in props.items():
+                start, end = self.span(value, advance=False)
+                doc.prop_name.append(self.name_id(name))
+                doc.prop_start.append(start)
+                doc.prop_end.append(end)
+        if parent == NONE:
+            previous = self.last_top
+            self.last_top = node
+        else:
+            previous = self.last_child[parent]
+            self.last_child[parent] = node
+            if previous == NONE:
+                doc.first_child[parent] = node
+        if previous != NONE:
+            doc.next_sibling[previous] = node
+        return node
+
+    def add_html_node(self, node, parent=NONE):
+        stack = [(node, parent)]
+        while stack:
+            item, parent = stack.pop()
+            if isinstance(item, ParentNode):
+                if item.tag is None:
+                    raise ValueError('ParentNode.tag should not be None')
+                if not item.children:
+                    raise ValueError('ParentNode.children should not be empty')
+                index = self.add(ELEMENT, item.tag, parent, props=item.props)
+                stack.extend((child, index) for child in reversed(item.children))
+            else:
+                if item.value is None:
+                    raise ValueError('LeafNode.value should not be None')
+                kind = RAW if isinstance(item, RawNode) else TEXT
+                self.add(kind, item.tag, parent, item.value, item.props)
+
+    def add_textnodes(self, nodes, parent=NONE):
+        stack = [(node, parent) for node in reversed(nodes)]
+        while stack:
+            item, parent = stack.pop()
+            text_type = item.text_type
+            tag = TEXT_TYPE_TAGS[text_type]
+            if type(item) is EmphasisNode:
+                index = self.add(ELEMENT, tag, parent)
+                stack.extend((child, index) for child in reversed(item.children))
+            elif text_type is TextType.LINK:
+                self.add(TEXT, tag, parent, item.text, {'href': item.url})
+            elif text_type is TextType.IMAGE:
+                self.add(TEXT, tag, parent, '', {'src': item.url, 'alt': item.text})
+            else:
+                self.add(TEXT, tag, parent, item.text)
+
+    def finish(self):
+        doc = self.doc
+        doc.extra = ''.join(self.extra)
+        return doc
+
+def from_html_node(node, source=''):
+    builder = FlatBuilder(source)
+    builder.add_html_node(node)
+    return builder.finish()
+
+def from_textnodes(nodes, source=''):
+    builder = FlatBuilder(source)
+    builder.add_textnodes(nodes)
+    return builder.finish()
+
+def from_markdown(markdown):
+    # Same tree as markdown_to_html_node(markdown), built one block at a time
+    # so only a single block's HTMLNode tree exists at once. Text is located
+    # from each block's offset, so most spans point into markdown itself.
+    builder = FlatBuilder(markdown)
+    root = builder.add(ELEMENT, 'div', NONE)
+    start = 0
+    while start <= len(markdown):
+        end = markdown.find('\n\n', start)
+        if end == -1:
+            end = len(markdown)
+        block = markdown[start:end].strip()
+        if block:
+            builder.anchor = start
+            builder.add_html_node(block_to_html_node(block, classify_block(block)), root)
+        start = end + 2
+    if builder.doc.first_child[root] == NONE:
+        builder.add(TEXT, None, root, '')
+    return builder.finish()
+
+def to_html_node(doc):
+    if not len(doc) or doc.next_sibling[0] != NONE:
+        raise ValueError('FlatDocument should have exactly one top-level node')
+    # Children always follow their parent, so building from the last node
+    # back means every child exists before its parent needs it
+    built = [None] * len(doc)
+    names = doc.names
+    for node in range(len(doc) - 1, -1, -1):
+        kind = doc.kind[node]
+        if kind == ELEMENT:
+            children = [built[child] for child in doc.children(node)]
+            built[node] = ParentNode._owned(names[doc.tag[node]], children, doc.props(node))
+        elif kind == RAW:
+            built[node] = RawNode(doc.text(doc.start[node], doc.end[node]))
+        else:
+            leaf = SafeLeafNode if kind == SAFE else LeafNode
+            value = doc.text(doc.start[node], doc.end[node])
+            built[node] = leaf._owned(names[doc.tag[node]], value, props=doc.props(node))
+        # Drop references to children once attached so memory isn't doubled
+        for child in doc.children(node):
+            built[child] = None
+    return built[0]
+
+def to_textnodes(doc, first=0):
+    nodes = []
+    node = first if len(doc) else NONE
+    names = doc.names
+    while node != NONE:
+        tag = names[doc.tag[node]]
+        text_type = TAG_TEXT_TYPES.get(tag)
+        if text_type is None and tag is not None or doc.kind[node] == RAW:
+            raise ValueError(f'FlatDocument node {node} is not inline text')
+        if doc.kind[node] == ELEMENT:
+            nodes.append(EmphasisNode(text_type, to_textnodes(doc, doc.first_child[node])))
+        else:
+            text = doc.text(doc.start[node], doc.end[node])
+            props = doc.props(node)
+            if text_type is TextType.LINK:
+                nodes.append(TextNode(text, text_type, props['href']))
+            elif text_type is TextType.IMAGE:
+                nodes.append(TextNode(props['alt'], text_type, props['src']))
+            else:
+                nodes.append(TextNode(text, text_type))
+        node = doc.next_sibling[node]
+    return nodes
+
+def iter_flat_html(doc, batch=256):
+    # Serializes straight from the arrays, walking first-child and
+    # next-sibling links, so no node objects are created
+    parts = []
+    append = parts.append
+    names = doc.names
+    kinds = doc.kind
+    tags = doc.tag
+    parents = doc.parent
+    first_child = doc.first_child
+    next_sibling = doc.next_sibling
+    starts = doc.start
+    ends = doc.end
+    prop_first = doc.prop_first
+    prop_count = doc.prop_count
+    prop_name = doc.prop_name
+    prop_start = doc.prop_start
+    prop_end = doc.prop_end
+    source = doc.source
+    extra = doc.extra
+    split = len(source)
+    node = 0 if len(doc) else NONE
+    while node != NONE:
+        kind = kinds[node]
+        tag = names[tags[node]]
+        if tag is not None:
+            strings = TAG_STRINGS.get(tag) or tag_strings(tag)
+            count = prop_count[node]
+            if count:
+                attributes = ''
+                first = prop_first[node]
+                for index in range(first, first + count):
+                    start = prop_start[index]
+                    end = prop_end[index]
+                    prop = extra[start - split:end - split] if start >= split else source[start:end]
+                    if kind != SAFE:
+                        prop = escape_attribute(prop)
+                    attributes += f' {names[prop_name[index]]}="{prop}"'
+                append(f'{strings[2]}{attributes}>')
+            else:
+                append(strings[0])
+            if kind == ELEMENT:
+                child = first_child[node]
+                if child == NONE:
+                    raise ValueError('ParentNode.children should not be empty')
+                node = child
+                continue
+        start = starts[node]
+        end = ends[node]
+        value = extra[start - split:end - split] if start >= split else source[start:end]
+        append(escape_text(value) if kind == TEXT else value)
+        if tag is not None:
+            append(strings[1])
+        if len(parts) >= batch:
+            yield ''.join(parts)
+            parts.clear()
+        # Move to the next sibling, closing every element finished on the way
+        while True:
+            sibling = next_sibling[node]
+            if sibling != NONE:
+                node = sibling
+                break
+            node = parents[node]
+            if node == NONE:
+                break
+            tag = names[tags[node]]
+            append((TAG_STRINGS.get(tag) or tag_strings(tag))[1])
+    if parts:
+        yield ''.join(parts)
+
+def to_html(doc):
+    return ''.join(iter_flat_html(doc))
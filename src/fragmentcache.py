@@ -0,0 +1,97 @@
+import hashlib
+import os
+import tempfile
+import time
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+TOUCH_INTERVAL = 60
+
+class FragmentCache:
+    # Rendered block HTML stored on disk, one file per fragment, named by a
+    # hash of the renderer version, block type and block text. Safe to share
+    # between concurrent builds: files are written to a temp name and moved
+    # into place, and readers treat a vanished file as a miss.
+    def __init__(self, directory, version, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, block, block_type):
+        digest = hashlib.sha256(f'{self.version}\0{block_type}\0'.encode('utf-8'))
+        digest.update(block.encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def get(self, block, block_type):
+        path = self.path(self.key(block, block_type))
+        try:
+            with open(path, 'r', encoding='utf-8') as fp:
+                html = fp.read()
+                modified = os.fstat(fp.fileno()).st_mtime
+            # Touch so eviction sees this fragment as recently used, but at
+            # most once per TOUCH_INTERVAL to keep warm hits cheap
+            if time.time() - modified > TOUCH_INTERVAL:
+                os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return html
+
+    def put(self, block, block_type, html):
+        path = self.path(self.key(block, block_type))
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                fp.write(html)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        self.writes += 1
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes}
+
+    def evict(self, target=0.9):
+        # Deletes least recently used fragments until the cache is under
+        # target * max_bytes. Returns the number of files removed.
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.startswith('.tmp-'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return 0
+        entries.sort()
+        limit = self.max_bytes * target
+        removed = 0
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
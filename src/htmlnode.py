@@ -1,4 +1,44 @@
+# Escaping happens while serializing, so output is never rescanned. Strings
+# with nothing to escape are returned as-is, and a chain of str.replace calls
+# beats str.translate with a mapping table by several times in CPython.
+def escape_text(text):
+    if type(text) is not str:
+        text = str(text)
+    if '&' not in text and '<' not in text and '>' not in text:
+        return text
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def escape_attribute(value):
+    if type(value) is not str:
+        value = str(value)
+    if '&' not in value and '<' not in value and '>' not in value and '"' not in value:
+        return value
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+# Tag strings built once per tag: (open, close, open without '>'). Tags come
+# from the renderer, not from content, so this stays small.
+TAG_STRINGS = {}
+
+def tag_strings(tag):
+    strings = TAG_STRINGS[tag] = (f'<{tag}>', f'</{tag}>', f'<{tag}')
+    return strings
+
+def start_tag(tag, props):
+    strings = TAG_STRINGS.get(tag) or tag_strings(tag)
+    if not props:
+        return strings[0]
+    attributes = ''
+    for key, value in props.items():
+        attributes += f' {key}="{escape_attribute(value)}"'
+    return f'{strings[2]}{attributes}>'
+
+def end_tag(tag):
+    strings = TAG_STRINGS.get(tag) or tag_strings(tag)
+    return strings[1]
+
 class HTMLNode:
+    __slots__ = ('tag', 'value', 'children', 'props')
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -11,40 +51,146 @@ class HTMLNode:
         else:
             self.props = props
 
+    @classmethod
+    def _owned(cls, tag=None, value=None, children=None, props=None):
+        # Internal constructor that skips the defensive copies. The caller
+        # hands over children/props and must not touch them afterwards.
+        node = object.__new__(cls)
+        node.tag = tag
+        node.value = value
+        node.children = children
+        node.props = props
+        return node
+
     def to_html(self):
         raise NotImplementedError
     
     def props_to_html(self):
         if not isinstance(self.props, dict):
             return ''
-        strings = [f' {key}="{value}"' for key, value in self.props.items()]
+        strings = [f' {key}="{escape_attribute(value)}"' for key, value in self.props.items()]
         return ''.join(strings)
     
     def __repr__(self):
         return f'HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})'
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
-        super().__init__(tag=tag, value=value, children=None, props=props)
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props.copy() if props is not None else None
     
     def to_html(self):
-        if self.value is None:
+        value = self.value
+        if value is None:
+            raise ValueError('LeafNode.value should not be None')
+        # escape_text's fast path, inlined: the call costs more than the check
+        if type(value) is not str or '&' in value or '<' in value or '>' in value:
+            value = escape_text(value)
+        tag = self.tag
+        if tag is None:
+            return value
+        strings = TAG_STRINGS.get(tag) or tag_strings(tag)
+        props = self.props
+        if not props:
+            return f'{strings[0]}{value}{strings[1]}'
+        # Appending f-strings beats building a list and joining it for the
+        # one or two attributes leaves carry
+        attributes = ''
+        for key, prop in props.items():
+            if type(prop) is not str or '&' in prop or '<' in prop or '>' in prop or '"' in prop:
+                prop = escape_attribute(prop)
+            attributes += f' {key}="{prop}"'
+        return f'{strings[2]}{attributes}>{value}{strings[1]}'
+
+class SafeLeafNode(LeafNode):
+    # A leaf whose value and props the caller has already checked contain
+    # nothing to escape, e.g. because the source text they were cut from had
+    # none of &<>". Skips the per-value checks in LeafNode.to_html.
+    __slots__ = ()
+
+    def to_html(self):
+        value = self.value
+        if value is None:
             raise ValueError('LeafNode.value should not be None')
-        if self.tag is None:
-            return self.value
-        return f'<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>'
+        tag = self.tag
+        if tag is None:
+            return value
+        strings = TAG_STRINGS.get(tag) or tag_strings(tag)
+        props = self.props
+        if not props:
+            return f'{strings[0]}{value}{strings[1]}'
+        attributes = ''
+        for key, prop in props.items():
+            attributes += f' {key}="{prop}"'
+        return f'{strings[2]}{attributes}>{value}{strings[1]}'
+
+class RawNode(LeafNode):
+    # Trusted, already-serialized HTML that is emitted without escaping
+    __slots__ = ()
+
+    def __init__(self, value):
+        self.tag = None
+        self.value = value
+        self.children = None
+        self.props = None
+
+    def to_html(self):
+        if self.value is None:
+            raise ValueError('RawNode.value should not be None')
+        return self.value
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
-        super().__init__(tag=tag, value=None, children=children, props=props)
+        self.tag = tag
+        self.value = None
+        self.children = children[:] if children is not None else None
+        self.props = props.copy() if props is not None else None
+
+    @classmethod
+    def _owned(cls, tag, children, props=None):
+        return super()._owned(tag, None, children, props)
 
     def to_html(self):
-        if self.tag is None:
-            raise ValueError('ParentNode.tag should not be None')
-        if (self.children is None) or (len(self.children) == 0):
-            raise ValueError('ParentNode.children should not be empty')
+        return ''.join(iter_html(self))
 
-        html_strings = [child.to_html() for child in self.children]
-        formatted_html = ''.join(html_strings)
+def iter_html(node, batch=256):
+    # Walks the tree with an explicit stack instead of recursing, so deep
+    # trees don't hit the recursion limit and no level re-copies its children.
+    # Strings on the stack are pending close tags. Output is yielded in
+    # chunks of about `batch` pieces to keep generator overhead low.
+    parts = []
+    append = parts.append
+    stack = [node]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        item = pop()
+        cls = type(item)
+        if cls is str:
+            append(item)
+        elif cls is ParentNode or isinstance(item, ParentNode):
+            if item.tag is None:
+                raise ValueError('ParentNode.tag should not be None')
+            children = item.children
+            if (children is None) or (len(children) == 0):
+                raise ValueError('ParentNode.children should not be empty')
+            append(start_tag(item.tag, item.props))
+            push(end_tag(item.tag))
+            stack.extend(reversed(children))
+        else:
+            append(item.to_html())
+            if len(parts) >= batch:
+                yield ''.join(parts)
+                parts.clear()
+    if parts:
+        yield ''.join(parts)
 
-        return f'<{self.tag}>{formatted_html}</{self.tag}>'
\ No newline at end of file
+def write_html(node, fp):
+    for chunk in iter_html(node):
+        fp.write(chunk)
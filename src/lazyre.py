@@ -0,0 +1,18 @@
+class LazyPattern:
+    # A regex compiled, and re imported, the first time it is used rather
+    # than at import. Each attribute is copied onto the instance on first
+    # access, so afterwards pattern.search costs the same as on a compiled
+    # pattern.
+    def __init__(self, pattern):
+        self.source = pattern
+        self.compiled = None
+
+    def __getattr__(self, name):
+        # Only reached for attributes not copied yet
+        compiled = self.compiled
+        if compiled is None:
+            import re
+            compiled = self.compiled = re.compile(self.source)
+        value = getattr(compiled, name)
+        setattr(self, name, value)
+        return value
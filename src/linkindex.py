@@ -0,0 +1,85 @@
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+# Links found while rendering the current page, as (kind, target) keys of a
+# dict used as an ordered set, so a page repeating one link a million times
+# holds it once. None unless a caller started collecting, so rendering
+# without an index is free.
+current = None
+
+def start():
+    global current
+    current = {}
+
+def finish():
+    # Returns the distinct links in the order first seen
+    global current
+    links = current
+    current = None
+    return list(links) if links is not None else None
+
+def url_candidates(url_path):
+    # Output paths a URL path may be served from, in order of preference
+    path = posixpath.normpath(url_path).lstrip('/')
+    if path in ('', '.'):
+        return ['index.html']
+    if url_path.endswith('/'):
+        return [path + '/index.html']
+    return [path, path + '.html', path + '/index.html']
+
+def internal_path(target):
+    # The URL path of a same-site target, or None for external, mailto: and
+    # fragment-only targets
+    parts = urlsplit(target)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    return unquote(parts.path)
+
+class LinkIndex:
+    def __init__(self):
+        self.links = {}
+        self.targets = {}
+
+    def set_links(self, source, links):
+        self.remove(source)
+        self.links[source] = links
+        targets = self.targets
+        for _, target in links:
+            referrers = targets.get(target)
+            if referrers is None:
+                referrers = targets[target] = set()
+            referrers.add(source)
+
+    def remove(self, source):
+        for _, target in self.links.pop(source, ()):
+            referrers = self.targets.get(target)
+            if referrers is None:
+                continue
+            referrers.discard(source)
+            if not referrers:
+                del self.targets[target]
+
+    def referrers(self, target):
+        return sorted(self.targets.get(target, ()))
+
+    def check(self, outputs, source_outputs):
+        # Returns sorted (source, kind, target) for every internal link or
+        # image that doesn't resolve to one of outputs. source_outputs maps
+        # each source to its output path, for resolving relative targets.
+        broken = []
+        resolved = {}
+        for source, links in self.links.items():
+            directory = posixpath.dirname(source_outputs.get(source, source))
+            for kind, target in links:
+                path = internal_path(target)
+                if path is None:
+                    continue
+                if not path.startswith('/'):
+                    path = '/' + posixpath.join(directory, path)
+                found = resolved.get(path)
+                if found is None:
+                    found = resolved[path] = any(candidate in outputs for candidate in url_candidates(path))
+                if not found:
+                    broken.append((source, kind, target))
+        broken.sort()
+        return broken
@@ -1,7 +1,142 @@
-from textnode import *
+import argparse
+import os
+import sys
 
-def main():
-    node = TextNode('go fuck yourself', 'normal', 'https://addictinggames.com')
-    print(node)
+# Subsystems are imported by the command that needs them, so --help, a merge
+# or a build with nothing to render don't pay for the renderer or the
+# worker pool. bench_startup checks the budget.
 
-main()
\ No newline at end of file
+def shard_arg(text):
+    from shards import parse_shard
+    try:
+        return parse_shard(text)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Build, merge or serve the static site.')
+    parser.add_argument('command', nargs='?', choices=('build', 'merge', 'serve'), default='build')
+    parser.add_argument('--content', default='content', help='markdown source directory')
+    parser.add_argument('--static', default='static', help='static asset directory')
+    parser.add_argument('--template', default='template.html', help='page template')
+    parser.add_argument('--public', default='public', help='output directory')
+    parser.add_argument('--manifest', default='.build_manifest.json', help='incremental build manifest')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='worker processes for rendering (0 = one per CPU)'
+    )
+    parser.add_argument(
+        '--render-cache', type=int, default=0, metavar='N',
+        help='cache up to N parsed inline texts and rendered blocks per process'
+    )
+    parser.add_argument('--fragment-cache', metavar='DIR', help='persistent on-disk cache of rendered blocks')
+    parser.add_argument(
+        '--fragment-cache-mb', type=int, default=256, metavar='MB',
+        help='size cap for --fragment-cache, least recently used fragments are evicted'
+    )
+    parser.add_argument(
+        '--stream-over', type=int, metavar='MB',
+        help='render pages of at least MB block by block, keeping memory bounded by the largest block'
+    )
+    parser.add_argument(
+        '--shard', type=shard_arg, metavar='i/N',
+        help='build only shard i of N (0 to N-1) into its own directory under --shards'
+    )
+    parser.add_argument(
+        '--shards', default='shards', metavar='DIR',
+        help='per-shard output directories, which merge combines into --public'
+    )
+    parser.add_argument(
+        '--shard-count', type=int, metavar='N',
+        help='merge: only the shards of a build with N shards, ignoring others left under --shards'
+    )
+    parser.add_argument('--minify', action='store_true', help='collapse whitespace in pages outside pre and code')
+    parser.add_argument('--precompress', action='store_true', help='write a .gz next to each page')
+    parser.add_argument('--check-links', action='store_true', help='report broken internal links and images')
+    parser.add_argument('--profile', action='store_true', help='print a per-stage timing breakdown')
+    parser.add_argument('--profile-json', metavar='PATH', help='also write the profile as JSON')
+    parser.add_argument('--watch', action='store_true', help='serve: re-render pages as sources change')
+    parser.add_argument('--host', default='127.0.0.1', help='serve: address to listen on')
+    parser.add_argument('--port', type=int, default=8888, help='serve: port to listen on')
+    return parser.parse_args(argv)
+
+def report_links(stats, check_links):
+    if not check_links:
+        return
+    for source, kind, target in stats['broken']:
+        print(f'broken {kind} in {source}: {target}')
+    print(f'checked {sum(len(links) for links in stats["links"].links.values())} links, '
+          f'{len(stats["broken"])} broken')
+    if stats['broken']:
+        sys.exit(1)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'serve':
+        from devserver import serve
+        serve(args.content, args.static, args.template, args.host, args.port, watch_changes=args.watch)
+        return
+    if args.command == 'merge':
+        from shards import find_shards, merge_shards
+        try:
+            shard_dirs = find_shards(args.shards, args.shard_count)
+            stats = merge_shards(shard_dirs, args.public, args.manifest, check_links=args.check_links)
+        except (OSError, ValueError) as error:
+            sys.exit(f'merge failed: {error}')
+        print(
+            f'merged {stats["shards"]} shards: copied {len(stats["copied"])}, '
+            f'skipped {stats["skipped"]}, deleted {len(stats["deleted"])}'
+        )
+        report_links(stats, args.check_links)
+        return
+    from build import build_site
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    profile = args.profile or args.profile_json is not None
+    if profile:
+        import profiler
+        profiler.install()
+    fragment_cache = None
+    if args.fragment_cache:
+        fragment_cache = (args.fragment_cache, args.fragment_cache_mb * 1024 * 1024)
+    public, manifest = args.public, args.manifest
+    if args.shard is not None:
+        from shards import SHARD_MANIFEST, SHARD_PUBLIC, shard_path
+        if args.check_links:
+            sys.exit('--check-links applies to merge when building shards')
+        directory = shard_path(args.shards, *args.shard)
+        public, manifest = os.path.join(directory, SHARD_PUBLIC), os.path.join(directory, SHARD_MANIFEST)
+        os.makedirs(directory, exist_ok=True)
+    stats = build_site(
+        args.content, args.static, args.template, public, manifest,
+        jobs=jobs, cache_size=args.render_cache, fragment_cache=fragment_cache, profile=profile,
+        check_links=args.check_links,
+        stream_bytes=args.stream_over * 1024 * 1024 if args.stream_over is not None else None,
+        shard=args.shard, minify=args.minify, precompress=args.precompress
+    )
+    print(
+        f'rendered {len(stats["rendered"])} ({len(stats["unchanged"])} unchanged), copied {len(stats["copied"])}, '
+        f'skipped {stats["skipped"]}, deleted {len(stats["deleted"])}'
+    )
+    post = stats['post']
+    if post is not None:
+        line = f'postprocessed {post["pages"]} pages ({post["unchanged"]} unchanged)'
+        if args.minify:
+            saved = 1 - post['chars_out'] / post['chars_in'] if post['chars_in'] else 0
+            line += f', minify {saved:.1%} smaller in {post["minify_seconds"] * 1000:.1f} ms'
+        if args.precompress:
+            ratio = post['gzip_bytes'] / post['bytes'] if post['bytes'] else 0
+            line += (f', gzip {post["bytes"]} -> {post["gzip_bytes"]} bytes ({ratio:.1%})'
+                     f' in {post["gzip_seconds"] * 1000:.1f} ms')
+        print(line)
+    for name, cache_stats in stats['cache'].items():
+        counters = ', '.join(f'{value} {key}' for key, value in cache_stats.items() if key not in ('size', 'maxsize'))
+        print(f'{name} cache: {counters}')
+    if profile:
+        snapshot = profiler.merge([profiler.snapshot()] + stats['profiles'])
+        print(profiler.format_report(snapshot))
+        if args.profile_json:
+            profiler.dump_json(snapshot, args.profile_json)
+    report_links(stats, args.check_links)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import os
+
+from lazyre import LazyPattern
+
+SLOT = LazyPattern(r'\{\{ *(\w+) *\}\}')
+
+class Template:
+    # A page template parsed once into literal segments and the slots
+    # between them: segments[0] slots[0] segments[1] ... segments[-1].
+    # Slots without a value keep their original text, so a template can be
+    # shared by pages that fill in different slots. Plain tuples of strings,
+    # so it pickles cheaply to worker processes.
+    def __init__(self, text):
+        segments = []
+        slots = []
+        placeholders = []
+        pos = 0
+        for match in SLOT.finditer(text):
+            segments.append(text[pos:match.start()])
+            slots.append(match.group(1))
+            placeholders.append(match.group())
+            pos = match.end()
+        segments.append(text[pos:])
+        self.segments = tuple(segments)
+        self.slots = tuple(slots)
+        self.placeholders = tuple(placeholders)
+
+    def render(self, values):
+        # values maps slot name to a string or an iterable of strings
+        segments = self.segments
+        parts = [segments[0]]
+        for index, slot in enumerate(self.slots):
+            value = values.get(slot)
+            if value is None:
+                value = self.placeholders[index]
+            elif not isinstance(value, str):
+                value = ''.join(value)
+            parts.append(value)
+            parts.append(segments[index + 1])
+        return ''.join(parts)
+
+    def write(self, fp, values):
+        # Like render, but writes to fp, so iterable values are streamed
+        segments = self.segments
+        fp.write(segments[0])
+        for index, slot in enumerate(self.slots):
+            value = values.get(slot)
+            if value is None:
+                fp.write(self.placeholders[index])
+            elif isinstance(value, str):
+                fp.write(value)
+            else:
+                for chunk in value:
+                    fp.write(chunk)
+            fp.write(segments[index + 1])
+
+def as_template(template):
+    return Template(template) if isinstance(template, str) else template
+
+# Compiled templates by path, reused until the file's mtime or size changes
+loaded = {}
+
+def load_template(path):
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = loaded.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as fp:
+        template = Template(fp.read())
+    loaded[path] = (key, template)
+    return template
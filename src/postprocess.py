@@ -0,0 +1,255 @@
+import hashlib
+import os
+import shutil
+import time
+
+from lazyre import LazyPattern
+
+# Whitespace inside these elements is significant, so the minifier leaves it
+PRESERVE_TAG = LazyPattern(r'(?i)<(/?)(pre|code|textarea|script|style)\b')
+# Where a run of whitespace that collapsing would change can start
+RUN_MARKS = ('\t', '\n', '\r', '\f', '  ')
+# HTML's whitespace, which unlike str.isspace() leaves &nbsp; alone
+SPACE = ' \t\n\r\f'
+
+COPY_SIZE = 1 << 20
+
+# Process-wide settings, off until enable() is called. Each worker process
+# enables its own copy, the same way as rendercache.
+settings = None
+counters = None
+
+def enable(minify=False, precompress=False):
+    global settings, counters
+    if not minify and not precompress:
+        disable()
+        return
+    settings = {'minify': minify, 'precompress': precompress}
+    counters = {
+        'pages': 0, 'unchanged': 0, 'chars_in': 0, 'chars_out': 0,
+        'bytes': 0, 'gzip_bytes': 0, 'minify_seconds': 0.0, 'gzip_seconds': 0.0,
+    }
+
+def disable():
+    global settings, counters
+    settings = None
+    counters = None
+
+def stats():
+    return dict(counters) if counters is not None else None
+
+def merge_stats(all_stats):
+    # Sums stats() results from several processes
+    merged = None
+    for process_stats in all_stats:
+        if process_stats is None:
+            continue
+        if merged is None:
+            merged = dict.fromkeys(process_stats, 0)
+        for key, value in process_stats.items():
+            merged[key] += value
+    return merged
+
+class Minifier:
+    # Collapses each run of whitespace to one space in text outside pre,
+    # code, textarea, script and style; tags and their attribute values are
+    # left as they are. Fed a page in chunks; a tag cut at a chunk
+    # boundary is held back until the rest of it arrives, and so is text
+    # after the last '>', which could still be inside a quoted value.
+    def __init__(self):
+        self.depth = 0
+        self.space = False
+        self.pending = ''
+
+    def feed(self, chunk):
+        text = self.pending + chunk
+        cut = text.rfind('<')
+        if cut == -1 or text.find('>', cut) != -1:
+            cut = text.rfind('>') + 1
+        self.pending = text[cut:]
+        text = text[:cut]
+        parts = []
+        pos = 0
+        for match in PRESERVE_TAG.finditer(text):
+            self.emit(text[pos:match.start()], parts)
+            parts.append(match.group())
+            self.space = False
+            if match.group(1):
+                self.depth = max(0, self.depth - 1)
+            else:
+                self.depth += 1
+            pos = match.end()
+        self.emit(text[pos:], parts)
+        return ''.join(parts)
+
+    def flush(self):
+        parts = []
+        self.emit(self.pending, parts)
+        self.pending = ''
+        return ''.join(parts)
+
+    def emit(self, text, parts):
+        if not text:
+            return
+        if not self.depth:
+            text = collapse_whitespace(text)
+            if self.space and text[0] == ' ' and not in_tag(text, 0):
+                text = text[1:]
+                if not text:
+                    return
+        parts.append(text)
+        self.space = text[-1] in SPACE
+
+def collapse_whitespace(text):
+    # Runs inside a tag are copied as they are, so attribute values keep
+    # their whitespace
+    if not any(mark in text for mark in RUN_MARKS):
+        return text
+    parts = []
+    pos = 0
+    for start, end in tag_runs(text):
+        parts.append(collapse_text(text[pos:start]))
+        parts.append(text[start:end])
+        pos = end
+    if not parts:
+        return collapse_text(text)
+    parts.append(collapse_text(text[pos:]))
+    return ''.join(parts)
+
+def collapse_text(text):
+    # Plain str.replace passes run several times faster than a regex
+    # substitution on typical pages, which have few runs to collapse
+    for char in '\t\n\r\f':
+        if char in text:
+            text = text.replace(char, ' ')
+    while '  ' in text:
+        text = text.replace('  ', ' ')
+    return text
+
+def tag_runs(text):
+    # Yields (start, end) of each whitespace run collapse_text would change
+    # that lies inside a tag. Found with str.find rather than a regex, which
+    # would try every character of the page.
+    if '>' not in text:
+        return
+    length = len(text)
+    marks = {mark: text.find(mark) for mark in RUN_MARKS}
+    open_at = close_at = 0
+    while True:
+        found = [index for index in marks.values() if index != -1]
+        if not found:
+            return
+        start = min(found)
+        end = start + 1
+        while end < length and text[end] in SPACE:
+            end += 1
+        if start and text[start - 1] == ' ':
+            start -= 1
+        if close_at != -1 and close_at < end:
+            close_at = text.find('>', end)
+            if close_at == -1:
+                return
+        if open_at != -1 and open_at < end:
+            open_at = text.find('<', end)
+        if open_at == -1 or close_at < open_at:
+            yield start, end
+        for mark, index in marks.items():
+            if index != -1 and index < end:
+                marks[mark] = text.find(mark, end)
+
+def in_tag(text, pos):
+    # A '>' coming before any '<' means pos is inside a tag, possibly one
+    # started in an earlier piece of text or holding a quoted '>'
+    close_at = text.find('>', pos)
+    if close_at == -1:
+        return False
+    open_at = text.find('<', pos)
+    return open_at == -1 or close_at < open_at
+
+def hash_path(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        while True:
+            data = fp.read(COPY_SIZE)
+            if not data:
+                return digest.hexdigest()
+            digest.update(data)
+
+def compress_file(path, gz_path):
+    # mtime=0 and no file name in the header, so equal pages give equal .gz.
+    # gzip is imported here so builds without --precompress never load it.
+    import gzip
+    tmp_path = gz_path + '.tmp'
+    with open(path, 'rb') as source, open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=9, mtime=0) as target:
+            shutil.copyfileobj(source, target, COPY_SIZE)
+    os.replace(tmp_path, gz_path)
+    return os.path.getsize(gz_path)
+
+class PageWriter:
+    # File-like target for a rendered page: minifies what is written, hashes
+    # it on the way to a temporary file, and on close keeps the existing
+    # output and .gz untouched when the content hash hasn't changed.
+    # Otherwise the page replaces the output and is compressed next to it.
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.tmp_path = output_path + '.tmp'
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        self.fp = open(self.tmp_path, 'w', encoding='utf-8')
+        self.minifier = Minifier() if settings['minify'] else None
+        self.digest = hashlib.sha256()
+
+    def write(self, text):
+        counters['chars_in'] += len(text)
+        if self.minifier is not None:
+            start = time.perf_counter()
+            text = self.minifier.feed(text)
+            counters['minify_seconds'] += time.perf_counter() - start
+        self.put(text)
+
+    def put(self, text):
+        counters['chars_out'] += len(text)
+        self.digest.update(text.encode('utf-8'))
+        self.fp.write(text)
+
+    def close(self):
+        if self.minifier is not None:
+            self.put(self.minifier.flush())
+        self.fp.close()
+        counters['pages'] += 1
+        output_path = self.output_path
+        size = os.path.getsize(self.tmp_path)
+        try:
+            unchanged = (os.path.getsize(output_path) == size
+                         and (not settings['precompress'] or os.path.exists(output_path + '.gz'))
+                         and hash_path(output_path) == self.digest.hexdigest())
+        except FileNotFoundError:
+            unchanged = False
+        if unchanged:
+            os.remove(self.tmp_path)
+            counters['unchanged'] += 1
+            return
+        if settings['precompress']:
+            # Compressed before the page is replaced, so a .gz never lags
+            # behind a page that was already updated
+            start = time.perf_counter()
+            counters['gzip_bytes'] += compress_file(self.tmp_path, output_path + '.gz')
+            counters['gzip_seconds'] += time.perf_counter() - start
+            counters['bytes'] += size
+        os.replace(self.tmp_path, output_path)
+
+    def abort(self):
+        self.fp.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,181 @@
+import json
+import time
+
+import build
+import htmlnode
+import postprocess
+import textnode
+
+# Stage name, module, attribute, and how to count nodes and bytes from the
+# call's arguments and result. Streamed pages reach the same stages through
+# classify_block, iter_markdown_blocks and PageWriter instead; they read
+# their source as they split it, so that time counts as markdown_to_blocks.
+STAGES = [
+    ('read', build, 'read_source', None, lambda args, result: len(result)),
+    ('markdown_to_blocks', textnode, 'markdown_to_blocks', lambda args, result: len(result), None),
+    ('block_to_block_type', textnode, 'classify_blocks', lambda args, result: len(result), None),
+    ('block_to_block_type', textnode, 'classify_block', lambda args, result: 1, None),
+    ('text_to_textnodes', textnode, 'text_to_textnodes', lambda args, result: len(result), None),
+    ('text_node_to_html_node', textnode, 'text_node_to_html_node', lambda args, result: 1, None),
+    ('to_html', htmlnode.ParentNode, 'to_html', None, lambda args, result: len(result)),
+    ('write', build, 'write_output', None, lambda args, result: len(args[1])),
+    ('write', postprocess.PageWriter, 'write', None, lambda args, result: len(args[1])),
+    ('write', postprocess.PageWriter, 'close', None, None),
+]
+# Generator functions, timed while they are iterated, counting a node per item
+ITER_STAGES = [
+    ('markdown_to_blocks', textnode, 'iter_markdown_blocks'),
+]
+
+class Profiler:
+    def __init__(self):
+        self.stages = {}
+        self.pages = []
+
+    def record(self, stage, seconds, nodes=0, nbytes=0):
+        totals = self.stages.get(stage)
+        if totals is None:
+            totals = self.stages[stage] = {'calls': 0, 'nodes': 0, 'bytes': 0, 'seconds': 0.0}
+        totals['calls'] += 1
+        totals['nodes'] += nodes
+        totals['bytes'] += nbytes
+        totals['seconds'] += seconds
+
+    def snapshot(self):
+        return {'stages': self.stages, 'pages': self.pages}
+
+# The profiler currently installed, and the functions it replaced. When
+# profiling is off nothing is wrapped, so the pipeline runs untouched.
+active = None
+replaced = []
+
+def wrap(profiler, stage, func, count_nodes, count_bytes):
+    perf_counter = time.perf_counter
+    record = profiler.record
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = perf_counter() - start
+        record(
+            stage, elapsed,
+            count_nodes(args, result) if count_nodes else 0,
+            count_bytes(args, result) if count_bytes else 0,
+        )
+        return result
+    return wrapper
+
+def wrap_iter(profiler, stage, func):
+    perf_counter = time.perf_counter
+    record = profiler.record
+    def wrapper(*args, **kwargs):
+        iterator = func(*args, **kwargs)
+        elapsed = 0.0
+        count = 0
+        try:
+            while True:
+                start = perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += perf_counter() - start
+                count += 1
+                yield item
+        finally:
+            record(stage, elapsed, count, 0)
+    return wrapper
+
+class TimedWriter:
+    # Stands in for the plain file a streamed page goes to, so its writes
+    # count as the write stage. PageWriter is timed where it is defined.
+    def __init__(self, profiler, fp):
+        self.record = profiler.record
+        self.fp = fp
+
+    def write(self, text):
+        start = time.perf_counter()
+        result = self.fp.write(text)
+        self.record('write', time.perf_counter() - start, 0, len(text))
+        return result
+
+def wrap_stream(profiler, func):
+    def wrapper(source_path, fp, template):
+        if not isinstance(fp, postprocess.PageWriter):
+            fp = TimedWriter(profiler, fp)
+        return func(source_path, fp, template)
+    return wrapper
+
+def wrap_page(profiler, func):
+    perf_counter = time.perf_counter
+    def wrapper(source_path, output_path, template, stream=False, previous_hash=None):
+        start = perf_counter()
+        result = func(source_path, output_path, template, stream, previous_hash)
+        profiler.pages.append((source_path, perf_counter() - start))
+        return result
+    return wrapper
+
+def install():
+    global active
+    if active is not None:
+        return active
+    active = Profiler()
+    for stage, owner, name, count_nodes, count_bytes in STAGES:
+        func = getattr(owner, name)
+        replaced.append((owner, name, func))
+        setattr(owner, name, wrap(active, stage, func, count_nodes, count_bytes))
+    for stage, owner, name in ITER_STAGES:
+        func = getattr(owner, name)
+        replaced.append((owner, name, func))
+        setattr(owner, name, wrap_iter(active, stage, func))
+    replaced.append((build, 'render_page_stream', build.render_page_stream))
+    build.render_page_stream = wrap_stream(active, build.render_page_stream)
+    replaced.append((build, 'render_page_file', build.render_page_file))
+    build.render_page_file = wrap_page(active, build.render_page_file)
+    return active
+
+def uninstall():
+    global active
+    while replaced:
+        owner, name, func = replaced.pop()
+        setattr(owner, name, func)
+    active = None
+
+def snapshot():
+    return active.snapshot() if active is not None else None
+
+def merge(snapshots):
+    # Combines snapshot() results from several processes
+    merged = Profiler()
+    for snap in snapshots:
+        if snap is None:
+            continue
+        for stage, totals in snap['stages'].items():
+            target = merged.stages.setdefault(stage, {'calls': 0, 'nodes': 0, 'bytes': 0, 'seconds': 0.0})
+            for key, value in totals.items():
+                target[key] += value
+        merged.pages.extend(tuple(page) for page in snap['pages'])
+    return merged.snapshot()
+
+def format_report(snap, slowest=10):
+    lines = [f'{"stage":<24} {"calls":>9} {"nodes":>10} {"bytes":>12} {"seconds":>9}']
+    for stage in dict.fromkeys(entry[0] for entry in STAGES):
+        totals = snap['stages'].get(stage)
+        if totals is None:
+            continue
+        lines.append(
+            f'{stage:<24} {totals["calls"]:>9} {totals["nodes"]:>10} '
+            f'{totals["bytes"]:>12} {totals["seconds"]:>9.4f}'
+        )
+    pages = sorted(snap['pages'], key=lambda page: page[1], reverse=True)[:slowest]
+    if pages:
+        lines.append('')
+        lines.append('slowest pages:')
+        for path, seconds in pages:
+            lines.append(f'{seconds * 1000:>10.2f} ms  {path}')
+    return '\n'.join(lines)
+
+def dump_json(snap, path):
+    with open(path, 'w', encoding='utf-8') as fp:
+        json.dump(snap, fp, indent=1)
+        fp.write('\n')
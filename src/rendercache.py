@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+
+# Bump whenever rendered HTML for the same markdown or the cached fragment
+# format changes, so persistent caches keyed on it stop serving old fragments
+# and builds re-render pages rendered by an older version. Kept here rather
+# than in textnode so a build can check it without loading the renderer.
+RENDERER_VERSION = 5
+
+class LRUCache:
+    def __init__(self, maxsize):
+        if maxsize <= 0:
+            raise ValueError('LRUCache.maxsize should be positive')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+        }
+
+    def __len__(self):
+        return len(self.data)
+
+# Process-wide caches, off until enable() is called. Each worker process gets
+# its own copies, so nothing is shared across processes. Cached values are
+# immutable (tuples and strings) so callers can't corrupt them.
+inline_cache = None
+block_cache = None
+# Optional fragmentcache.FragmentCache consulted when block_cache misses
+disk_cache = None
+
+def enable(maxsize):
+    global inline_cache, block_cache
+    inline_cache = LRUCache(maxsize)
+    block_cache = LRUCache(maxsize)
+
+def enable_disk(cache):
+    global disk_cache
+    disk_cache = cache
+
+def disable():
+    global inline_cache, block_cache, disk_cache
+    inline_cache = None
+    block_cache = None
+    disk_cache = None
+
+def stats():
+    return {
+        'inline': inline_cache.stats() if inline_cache is not None else None,
+        'block': block_cache.stats() if block_cache is not None else None,
+        'disk': disk_cache.stats() if disk_cache is not None else None,
+    }
+
+def merge_stats(all_stats):
+    # Sums stats() results from several processes
+    merged = {}
+    for process_stats in all_stats:
+        for name, cache_stats in process_stats.items():
+            if cache_stats is None:
+                continue
+            total = merged.setdefault(name, dict.fromkeys(cache_stats, 0))
+            for key, value in cache_stats.items():
+                total[key] += value
+    return merged
@@ -0,0 +1,155 @@
+import os
+import shutil
+
+from build import (
+    MANIFEST_VERSION, POSTPROCESS_OFF, is_fresh, load_manifest, remove_output, remove_precompressed, save_manifest,
+    shard_of,
+)
+from linkindex import LinkIndex
+
+# Each shard directory holds the shard's output tree and its manifest, so a
+# node can ship the directory as a whole
+SHARD_PUBLIC = 'public'
+SHARD_MANIFEST = 'manifest.json'
+
+def shard_path(shards_dir, index, count):
+    return os.path.join(shards_dir, f'{index}-of-{count}')
+
+def parse_shard(text):
+    # 'i/N' -> (i, N), with shards numbered 0 to N - 1
+    index, sep, count = text.partition('/')
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise ValueError(f'shard should look like i/N, got {text!r}')
+    index, count = int(index), int(count)
+    if count < 1:
+        raise ValueError(f'shard count should be at least 1, got {count}')
+    if index >= count:
+        raise ValueError(f'shard index should be between 0 and {count - 1}, got {index}')
+    return index, count
+
+def find_shards(shards_dir, count=None):
+    # With a count, only that build's i-of-count directories, so ones left
+    # over from building with another shard count are ignored
+    suffix = f'-of-{count}' if count is not None else ''
+    return sorted(
+        os.path.join(shards_dir, name) for name in os.listdir(shards_dir)
+        if name.endswith(suffix) and os.path.isfile(os.path.join(shards_dir, name, SHARD_MANIFEST))
+    )
+
+def load_shards(shard_dirs):
+    # Returns [(directory, manifest)] ordered by shard index, after checking
+    # the shards form exactly one complete, non-overlapping build
+    shards = []
+    for directory in shard_dirs:
+        manifest = load_manifest(os.path.join(directory, SHARD_MANIFEST))
+        if manifest is None or 'shard' not in manifest:
+            raise ValueError(f'{directory}: no shard manifest')
+        shards.append((directory, manifest))
+    if not shards:
+        raise ValueError('no shards to merge')
+    shards.sort(key=lambda item: item[1]['shard']['index'])
+
+    count = shards[0][1]['shard']['count']
+    indexes = [manifest['shard']['index'] for _, manifest in shards]
+    if any(manifest['shard']['count'] != count for _, manifest in shards):
+        raise ValueError('shards were built with different shard counts, pick one with --shard-count')
+    if indexes != list(range(count)):
+        missing = sorted(set(range(count)) - set(indexes))
+        raise ValueError(f'expected shards 0 to {count - 1}, missing {missing}, got {indexes}')
+    template_hash = shards[0][1]['template']['hash']
+    if any(manifest['template']['hash'] != template_hash for _, manifest in shards):
+        raise ValueError('shards were built with different templates')
+    renderer = shards[0][1].get('renderer')
+    if any(manifest.get('renderer') != renderer for _, manifest in shards):
+        raise ValueError('shards were built with different renderer versions')
+    post = shards[0][1].get('postprocess', POSTPROCESS_OFF)
+    if any(manifest.get('postprocess', POSTPROCESS_OFF) != post for _, manifest in shards):
+        raise ValueError('shards were built with different --minify or --precompress settings')
+
+    outputs = {}
+    for directory, manifest in shards:
+        index = manifest['shard']['index']
+        for section in ('pages', 'static'):
+            for source, item in manifest[section].items():
+                if shard_of(source, count) != index:
+                    raise ValueError(f'{directory}: {source} belongs to shard {shard_of(source, count)}')
+                output = item['output']
+                if output in outputs:
+                    raise ValueError(f'{directory}: {output} is also written by {outputs[output]}')
+                outputs[output] = directory
+                if not os.path.isfile(os.path.join(directory, SHARD_PUBLIC, output)):
+                    raise ValueError(f'{directory}: missing output {output}')
+                if section == 'pages' and post['precompress'] and not os.path.isfile(
+                        os.path.join(directory, SHARD_PUBLIC, output + '.gz')):
+                    raise ValueError(f'{directory}: missing output {output}.gz')
+    return shards
+
+def merge_shards(shard_dirs, public_dir, manifest_path, check_links=False):
+    # Copies every shard's outputs into public_dir and writes the combined
+    # manifest there, which is an ordinary build manifest. Outputs whose
+    # source and template hashes match the last merge are left in place.
+    shards = load_shards(shard_dirs)
+    old_manifest = load_manifest(manifest_path) or {}
+    old_sections = {section: old_manifest.get(section, {}) for section in ('pages', 'static')}
+    template = shards[0][1]['template']
+    post = shards[0][1].get('postprocess', POSTPROCESS_OFF)
+    old_post = old_manifest.get('postprocess', POSTPROCESS_OFF)
+    renderer = shards[0][1].get('renderer')
+    # Pages built with another renderer or other postprocess settings differ
+    # like a template change
+    template_changed = (template['hash'] != old_manifest.get('template', {}).get('hash')
+                        or renderer != old_manifest.get('renderer') or post != old_post)
+    if old_post['precompress'] and not post['precompress']:
+        remove_precompressed(public_dir, old_sections['pages'].values())
+    stats = {'copied': [], 'skipped': 0, 'deleted': [], 'shards': len(shards)}
+    index = stats['links'] = LinkIndex()
+
+    merged = {'pages': {}, 'static': {}}
+    for directory, manifest in shards:
+        for section in ('pages', 'static'):
+            old_entries = old_sections[section]
+            for source, item in manifest[section].items():
+                merged[section][source] = item
+                outputs = [item['output']]
+                stale = False
+                if section == 'pages':
+                    index.set_links(source, item['links'])
+                    stale = template_changed
+                    if post['precompress']:
+                        outputs.append(item['output'] + '.gz')
+                old_item = old_entries.get(source)
+                # Same html_hash: the page was rebuilt but came out the same
+                same_html = (old_item is not None and item.get('html_hash') is not None
+                             and item['html_hash'] == old_item.get('html_hash'))
+                if ((same_html or not stale and is_fresh(old_item, item['hash'], public_dir))
+                        and all(os.path.exists(os.path.join(public_dir, output)) for output in outputs)):
+                    stats['skipped'] += 1
+                    continue
+                for output in outputs:
+                    destination = os.path.join(public_dir, output)
+                    os.makedirs(os.path.dirname(destination), exist_ok=True)
+                    shutil.copy2(os.path.join(directory, SHARD_PUBLIC, output), destination)
+                stats['copied'].append(item['output'])
+
+    current_outputs = {item['output'] for section in merged.values() for item in section.values()}
+    for section, old_entries in old_sections.items():
+        for source, item in old_entries.items():
+            if source not in merged[section] and item['output'] not in current_outputs:
+                remove_output(public_dir, item['output'])
+                stats['deleted'].append(item['output'])
+                if section == 'pages' and old_post['precompress']:
+                    remove_precompressed(public_dir, [item])
+
+    if check_links:
+        source_outputs = {source: item['output'] for source, item in merged['pages'].items()}
+        stats['broken'] = index.check(current_outputs, source_outputs)
+
+    save_manifest(manifest_path, {
+        'version': MANIFEST_VERSION,
+        'template': template,
+        'renderer': renderer,
+        'pages': merged['pages'],
+        'static': merged['static'],
+        'postprocess': post,
+    })
+    return stats
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+# A small site on disk, shared by the tests and benchmarks that build one
+
+TEMPLATE = '<title>{{ Title }}</title><body>{{ Content }}</body>'
+
+# Paths relative to the site root, '/'-separated
+SITE = {
+    'content/index.md': '# Home\n\nWelcome **home**',
+    'content/blog/post.md': '# Post\n\n* one\n* two',
+    'static/styles.css': 'body {}',
+}
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as fp:
+        fp.write(text)
+    # Bump mtime so edits within the same timestamp tick are still seen
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+def write_site(root, files=SITE, template=TEMPLATE):
+    write(os.path.join(root, 'template.html'), template)
+    for path, text in files.items():
+        write(os.path.join(root, *path.split('/')), text)
+
+class SiteTestCase(unittest.TestCase):
+    # Each test starts from write_site(files, template) in a temporary
+    # directory, with public/ and manifest.json as build targets next to it
+    files = SITE
+    template_text = TEMPLATE
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, 'content')
+        self.static = os.path.join(root, 'static')
+        self.template = os.path.join(root, 'template.html')
+        self.public = os.path.join(root, 'public')
+        self.manifest = os.path.join(root, 'manifest.json')
+        write_site(root, self.files, self.template_text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        write(path, text)
@@ -0,0 +1,57 @@
+import random
+import unittest
+
+import bench_startup
+from bench import compare
+from corpus import make_adversarial, make_document, make_nested
+from textnode import classify_blocks, markdown_to_blocks
+
+class TestCorpus(unittest.TestCase):
+    def test_document_is_seeded(self):
+        self.assertEqual(make_document(seed=3, blocks=20), make_document(seed=3, blocks=20))
+        self.assertNotEqual(make_document(seed=3, blocks=20), make_document(seed=4, blocks=20))
+
+    def test_block_mix(self):
+        markdown = make_document(blocks=30, block_mix={'ORDERED_LIST': 1})
+        types = classify_blocks(markdown_to_blocks(markdown)[1:])
+        self.assertEqual({'ORDERED_LIST'}, {block_type.value for block_type in types})
+
+    def test_nested(self):
+        self.assertEqual('***word***', make_nested('word', 2))
+
+    def test_adversarial_length(self):
+        text = make_adversarial(random.Random(0), 1000)
+        self.assertGreaterEqual(len(text), 1000)
+        self.assertLess(len(text), 1100)
+
+class TestCompare(unittest.TestCase):
+    def test_compare(self):
+        baseline = {'results': {'fast': {'seconds': 1.0}, 'slow': {'seconds': 1.0}}}
+        results = {'fast': {'seconds': 1.1}, 'slow': {'seconds': 2.0}, 'new': {'seconds': 5.0}}
+        self.assertEqual([('slow', 1.0, 2.0, 2.0)], compare(results, baseline, 0.25))
+
+class TestStartup(unittest.TestCase):
+    def test_parse_importtime(self):
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       100 |        100 |   _io\n'
+            'import time:       200 |        300 | io\n'
+            'import time:        50 |         50 | build\n'
+            'unrelated line\n'
+        )
+        self.assertEqual(({'_io': 100, 'io': 300, 'build': 50}, 350), bench_startup.parse_importtime(stderr))
+
+    def test_fast_paths_skip_heavy_imports(self):
+        results = bench_startup.run(repeat=1)
+        self.assertEqual(set(bench_startup.CASES), set(results))
+        for name, result in results.items():
+            with self.subTest(name=name):
+                self.assertEqual([], result['heavy'])
+                self.assertGreater(result['import_seconds'], 0)
+
+    def test_over_budget(self):
+        results = {'startup/a': {'seconds': 0.02}, 'startup/b': {'seconds': 0.08}}
+        self.assertEqual([('startup/b', 80.0)], bench_startup.over_budget(results, 50))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import gzip
+import json
+import os
+import unittest
+
+import rendercache
+from build import build_site, list_files
+from sitefixture import TEMPLATE, SiteTestCase
+
+class TestBuildSite(SiteTestCase):
+    def read(self, *parts):
+        with open(os.path.join(self.public, *parts), encoding='utf-8') as fp:
+            return fp.read()
+
+    def build(self):
+        return build_site(self.content, self.static, self.template, self.public, self.manifest)
+
+    def test_full_build(self):
+        stats = self.build()
+        self.assertEqual(['blog/post.md', 'index.md'], stats['rendered'])
+        self.assertEqual(['styles.css'], stats['copied'])
+        self.assertEqual(
+            '<title>Home</title><body><div><h1 id="home">Home</h1><p>Welcome <b>home</b></p></div></body>',
+            self.read('index.html')
+        )
+        self.assertEqual(
+            '<title>Post</title><body><div><h1 id="post">Post</h1><ul><li>one</li><li>two</li></ul></div></body>',
+            self.read('blog', 'post.html')
+        )
+        self.assertEqual('body {}', self.read('styles.css'))
+
+    def test_streamed_pages_match(self):
+        self.write(os.path.join(self.content, 'big.md'), '# Big & <bold>\n\n' + 'Some *text* [here](/).\n\n' * 200)
+        self.build()
+        expected = {path: self.read(path) for path in ('index.html', 'blog/post.html', 'big.html')}
+        stats = build_site(self.content, self.static, self.template, self.public, self.manifest + '2', stream_bytes=0)
+        self.assertEqual(3, len(stats['rendered']))
+        self.assertEqual(expected, {path: self.read(path) for path in expected})
+        self.assertEqual([('link', '/')], stats['links'].links['big.md'])
+
+    def test_unchanged_rebuild_skips_everything(self):
+        self.build()
+        stats = self.build()
+        self.assertEqual([], stats['rendered'])
+        self.assertEqual([], stats['copied'])
+        self.assertEqual(3, stats['skipped'])
+
+    def test_edit_rebuilds_one_page(self):
+        self.build()
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nEdited')
+        stats = self.build()
+        self.assertEqual(['index.md'], stats['rendered'])
+        self.assertIn('<p>Edited</p>', self.read('index.html'))
+
+    def test_touch_without_change_skips(self):
+        self.build()
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nWelcome **home**')
+        self.assertEqual([], self.build()['rendered'])
+
+    def test_template_change_rebuilds_all(self):
+        self.build()
+        self.write(self.template, '<h1>{{ Title }}</h1>{{ Content }}')
+        stats = self.build()
+        self.assertEqual(['blog/post.md', 'index.md'], stats['rendered'])
+
+    def test_renderer_change_rebuilds_all(self):
+        self.build()
+        with open(self.manifest, encoding='utf-8') as fp:
+            manifest = json.load(fp)
+        self.assertEqual(rendercache.RENDERER_VERSION, manifest['renderer'])
+        # As left by an older renderer, or by a build from before the
+        # version was recorded
+        manifest['renderer'] -= 1
+        with open(self.manifest, 'w', encoding='utf-8') as fp:
+            json.dump(manifest, fp)
+        self.assertEqual(['blog/post.md', 'index.md'], self.build()['rendered'])
+        self.assertEqual([], self.build()['rendered'])
+        del manifest['renderer']
+        with open(self.manifest, 'w', encoding='utf-8') as fp:
+            json.dump(manifest, fp)
+        self.assertEqual(['blog/post.md', 'index.md'], self.build()['rendered'])
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, 'blog', 'post.md'))
+        stats = self.build()
+        self.assertEqual(['blog/post.html'], stats['deleted'])
+        self.assertFalse(os.path.exists(os.path.join(self.public, 'blog')))
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.public, 'index.html'))
+        self.assertEqual(['index.md'], self.build()['rendered'])
+        self.assertTrue(os.path.exists(os.path.join(self.public, 'index.html')))
+
+    def test_parallel_build_matches_serial(self):
+        for idx in range(20):
+            self.write(
+                os.path.join(self.content, 'many', f'page{idx}.md'),
+                f'# Page {idx}\n\nSome *text* with a [link](/page{idx})\n\n1. one\n2. two'
+            )
+        self.build()
+        serial = {}
+        for source in list_files(self.public):
+            serial[source] = self.read(source)
+        parallel_public = os.path.join(self.tmp.name, 'parallel')
+        parallel_manifest = os.path.join(self.tmp.name, 'parallel.json')
+        stats = build_site(self.content, self.static, self.template, parallel_public, parallel_manifest, jobs=3)
+        self.assertEqual(22, len(stats['rendered']))
+        self.assertEqual(sorted(serial), list_files(parallel_public))
+        for source, html in serial.items():
+            with open(os.path.join(parallel_public, source), encoding='utf-8') as fp:
+                self.assertEqual(html, fp.read())
+
+    def test_render_cache(self):
+        for idx in range(3):
+            self.write(os.path.join(self.content, f'dup{idx}.md'), f'# Dup {idx}\n\nThe same *footer*')
+        stats = self.build_with(cache_size=8)
+        self.assertEqual(2, stats['cache']['block']['hits'])
+        self.assertEqual('<title>Dup 2</title><body><div><h1 id="dup-2">Dup 2</h1><p>The same <i>footer</i></p></div></body>', self.read('dup2.html'))
+
+    def test_check_links(self):
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\n[post](/blog/post) [gone](/gone) ![css](/styles.css)')
+        stats = self.build_with(check_links=True)
+        self.assertEqual([('index.md', 'link', '/gone')], stats['broken'])
+        self.assertEqual(['index.md'], stats['links'].referrers('/blog/post'))
+
+        # Unchanged pages keep their links; deleting a target breaks them
+        os.remove(os.path.join(self.content, 'blog', 'post.md'))
+        stats = self.build_with(check_links=True)
+        self.assertEqual([], stats['rendered'])
+        self.assertEqual(
+            [('index.md', 'link', '/blog/post'), ('index.md', 'link', '/gone')],
+            stats['broken']
+        )
+
+    def test_unchanged_output_is_not_rewritten(self):
+        self.build()
+        path = os.path.join(self.public, 'index.html')
+        os.utime(path, ns=(0, 0))
+        # Only the blank lines between blocks change, not the page
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\n\n\nWelcome **home**\n')
+        stats = self.build()
+        self.assertEqual(['index.md'], stats['rendered'])
+        self.assertEqual(['index.md'], stats['unchanged'])
+        self.assertEqual(0, os.stat(path).st_mtime_ns)
+
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nWelcome *home*')
+        stats = self.build()
+        self.assertEqual([], stats['unchanged'])
+        self.assertIn('<i>home</i>', self.read('index.html'))
+
+        # The hash covers the template and postprocess settings too
+        self.write(self.template, TEMPLATE + '\n')
+        self.assertEqual([], self.build()['unchanged'])
+        self.assertEqual([], self.build_with(minify=True)['unchanged'])
+
+    def test_minify_and_precompress(self):
+        self.write(self.template, '<html>\n  <title>{{ Title }}</title>\n  <body>{{ Content }}</body>\n</html>\n')
+        self.write(os.path.join(self.content, 'code.md'), '# Code\n\n```\nkeep\n    this\n```')
+        stats = self.build_with(minify=True, precompress=True, jobs=2)
+        self.assertEqual(3, stats['post']['pages'])
+        self.assertLess(stats['post']['gzip_bytes'], stats['post']['bytes'] + 3 * 40)
+        html = self.read('code.html')
+        self.assertEqual('<html> <title>Code</title> <body><div><h1 id="code">Code</h1><pre><code>keep\n    this\n</code></pre></div></body> </html> ', html)
+        with gzip.open(os.path.join(self.public, 'code.html.gz'), 'rt', encoding='utf-8') as fp:
+            self.assertEqual(html, fp.read())
+        self.assertFalse(os.path.exists(os.path.join(self.public, 'styles.css.gz')))
+
+        # Unchanged pages are skipped, a missing .gz is rebuilt
+        os.remove(os.path.join(self.public, 'index.html.gz'))
+        stats = self.build_with(minify=True, precompress=True)
+        self.assertEqual(['index.md'], stats['rendered'])
+        self.assertTrue(os.path.exists(os.path.join(self.public, 'index.html.gz')))
+
+        # A template edit that minifies to the same pages rewrites nothing
+        self.write(self.template, '<html>\n    <title>{{ Title }}</title>\n    <body>{{ Content }}</body>\n</html>\n')
+        stats = self.build_with(minify=True, precompress=True)
+        self.assertEqual(3, len(stats['rendered']))
+        self.assertEqual(3, stats['post']['unchanged'])
+        self.assertEqual(0, stats['post']['gzip_bytes'])
+
+        # Deleting a source removes its .gz too
+        os.remove(os.path.join(self.content, 'code.md'))
+        self.build_with(minify=True, precompress=True)
+        self.assertFalse(os.path.exists(os.path.join(self.public, 'code.html.gz')))
+
+        # Turning the stage off re-renders every page and drops the .gz files
+        stats = self.build()
+        self.assertEqual(['blog/post.md', 'index.md'], stats['rendered'])
+        self.assertIsNone(stats['post'])
+        self.assertEqual(['blog/post.html', 'index.html', 'styles.css'], list_files(self.public))
+        self.assertIn('\n    <body>', self.read('index.html'))
+
+    def build_with(self, **kwargs):
+        return build_site(self.content, self.static, self.template, self.public, self.manifest, **kwargs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import contextlib
+import io
+import os
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+from devserver import DevSite, make_handler, resolve, watch
+from sitefixture import SiteTestCase
+
+class TestDevSite(SiteTestCase):
+    files = {
+        'content/index.md': '# Home\n\nhello',
+        'content/blog/post.md': '# Post\n\nbody',
+        'static/styles.css': 'body {}',
+    }
+    template_text = '{{ Title }}|{{ Content }}'
+
+    def setUp(self):
+        super().setUp()
+        self.site = DevSite(self.content, self.static, self.template)
+
+    def test_initial_refresh(self):
+        changed = self.site.refresh()
+        self.assertEqual(['blog/post.html', 'index.html', 'styles.css'], sorted(changed))
+        self.assertEqual(b'Home|<div><h1 id="home">Home</h1><p>hello</p></div>', self.site.get('index.html'))
+        self.assertEqual(b'body {}', self.site.get('styles.css'))
+
+    def test_refresh_only_touched(self):
+        self.site.refresh()
+        self.assertEqual([], self.site.refresh())
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nchanged')
+        self.assertEqual(['index.html'], self.site.refresh())
+        self.assertIn(b'changed', self.site.get('index.html'))
+
+    def test_template_change_rerenders_pages(self):
+        self.site.refresh()
+        self.write(self.template, '<b>{{ Title }}</b>')
+        self.assertEqual(['blog/post.html', 'index.html'], sorted(self.site.refresh()))
+        self.assertEqual(b'<b>Home</b>', self.site.get('index.html'))
+
+    def test_deleted_page(self):
+        self.site.refresh()
+        os.remove(os.path.join(self.content, 'blog', 'post.md'))
+        self.assertEqual(['blog/post.html'], self.site.refresh())
+        self.assertIsNone(self.site.get('blog/post.html'))
+
+    def test_render_error_keeps_last_version(self):
+        self.site.refresh()
+        self.write(os.path.join(self.content, 'index.md'), 'no title yet')
+        with open(os.devnull, 'w') as devnull:
+            with contextlib.redirect_stderr(devnull):
+                self.assertEqual([], self.site.refresh())
+        self.assertIn(b'hello', self.site.get('index.html'))
+
+    def test_missing_template_keeps_last_version(self):
+        self.site.refresh()
+        moved = self.template + '.swp'
+        os.rename(self.template, moved)
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nedited')
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            self.assertEqual(['index.html'], self.site.refresh())
+        self.assertIn('error loading template', stderr.getvalue())
+        self.assertEqual(b'Home|<div><h1 id="home">Home</h1><p>edited</p></div>', self.site.get('index.html'))
+        os.rename(moved, self.template)
+        self.assertEqual([], self.site.refresh())
+
+    def test_watch_survives_failed_refresh(self):
+        stop = threading.Event()
+        calls = []
+        def refresh():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise RuntimeError('boom')
+            stop.set()
+            return []
+        self.site.refresh = refresh
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            watch(self.site, 0, stop)
+        self.assertEqual([0, 1], calls)
+        self.assertIn('boom', stderr.getvalue())
+
+    def test_http(self):
+        self.site.refresh()
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(self.site))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            base = f'http://127.0.0.1:{server.server_address[1]}'
+            with urllib.request.urlopen(base + '/') as response:
+                self.assertEqual(b'Home|<div><h1 id="home">Home</h1><p>hello</p></div>', response.read())
+                self.assertEqual('text/html; charset=utf-8', response.headers['Content-Type'])
+            with urllib.request.urlopen(base + '/blog/post') as response:
+                self.assertIn(b'Post', response.read())
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                urllib.request.urlopen(base + '/missing')
+            self.assertEqual(404, cm.exception.code)
+            cm.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+class TestResolve(unittest.TestCase):
+    def test_resolve(self):
+        self.assertEqual(['index.html'], resolve('/'))
+        self.assertEqual(['blog/index.html'], resolve('/blog/'))
+        self.assertEqual(['styles.css', 'styles.css.html', 'styles.css/index.html'], resolve('/styles.css?v=1'))
+        self.assertEqual(['etc/passwd', 'etc/passwd.html', 'etc/passwd/index.html'], resolve('/../etc/passwd'))
+
+if __name__ == '__main__':
+    unittest.main()
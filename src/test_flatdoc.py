@@ -0,0 +1,101 @@
+import random
+import unittest
+
+import flatdoc
+import rendercache
+from corpus import make_document, make_paragraph
+from htmlnode import LeafNode, ParentNode, RawNode, SafeLeafNode
+from textnode import EmphasisNode, TextNode, TextType, markdown_to_html_node, tokenize_inline
+
+class TestFlatDocument(unittest.TestCase):
+    def test_from_markdown_matches_tree(self):
+        markdown = make_document(seed=5, blocks=60, nesting=2)
+        doc = flatdoc.from_markdown(markdown)
+        expected = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(expected, flatdoc.to_html(doc))
+        self.assertEqual(expected, flatdoc.to_html_node(doc).to_html())
+
+    def test_spans_point_into_source(self):
+        markdown = '# Title\n\nSome **bold** text'
+        doc = flatdoc.from_markdown(markdown)
+        self.assertIs(markdown, doc.source)
+        self.assertEqual('', doc.extra)
+        self.assertEqual(7, len(doc))
+
+    def test_unlocated_text_goes_to_extra(self):
+        doc = flatdoc.from_markdown('a paragraph\nover two lines')
+        self.assertEqual('a paragraph over two lines', doc.extra)
+        self.assertEqual('<div><p>a paragraph over two lines</p></div>', flatdoc.to_html(doc))
+
+    def test_html_round_trip(self):
+        tree = ParentNode('div', [
+            LeafNode(None, '1 < 2 & 3'),
+            ParentNode('p', [LeafNode('a', 'x', {'href': '/q?a=1&b="2"'})], {'class': 'c'}),
+            RawNode('<hr>'),
+            LeafNode('img', '', {'src': 'i.png', 'alt': 'pic'}),
+        ])
+        doc = flatdoc.from_html_node(tree)
+        self.assertEqual(tree.to_html(), flatdoc.to_html(doc))
+        rebuilt = flatdoc.to_html_node(doc)
+        self.assertEqual(tree.to_html(), rebuilt.to_html())
+        self.assertIsInstance(rebuilt.children[2], RawNode)
+        self.assertIsInstance(rebuilt.children[3], SafeLeafNode)
+        self.assertNotIsInstance(rebuilt.children[0], SafeLeafNode)
+
+    def test_non_str_values(self):
+        tree = ParentNode('p', [LeafNode(None, 0), LeafNode('td', 1.5, {'colspan': 2, 'title': '<x>'})])
+        doc = flatdoc.from_html_node(tree)
+        self.assertEqual(tree.to_html(), flatdoc.to_html(doc))
+        self.assertEqual(tree.to_html(), flatdoc.to_html_node(doc).to_html())
+
+    def test_many_props(self):
+        props = {f'data-{index}': str(index) for index in range(300)}
+        tree = ParentNode('div', [LeafNode(None, 'x')], props)
+        doc = flatdoc.from_html_node(tree)
+        self.assertEqual(props, doc.props(0))
+        self.assertEqual(tree.to_html(), flatdoc.to_html(doc))
+
+    def test_deep_tree(self):
+        node = LeafNode(None, 'x')
+        for _ in range(5000):
+            node = ParentNode('span', [node])
+        doc = flatdoc.from_html_node(node)
+        self.assertEqual(node.to_html(), flatdoc.to_html(doc))
+
+    def test_textnodes_round_trip(self):
+        for seed in range(10):
+            text = make_paragraph(random.Random(seed), 100, 0.3, nesting=2)
+            nodes = tokenize_inline(text)
+            with self.subTest(seed=seed):
+                doc = flatdoc.from_textnodes(nodes, text)
+                self.assertEqual(nodes, flatdoc.to_textnodes(doc))
+                self.assertEqual('', doc.extra)
+
+    def test_textnodes_without_source(self):
+        nodes = [
+            TextNode('see ', TextType.TEXT),
+            EmphasisNode(TextType.BOLD, [TextNode('docs', TextType.LINK, '/d'), TextNode('!', TextType.TEXT)]),
+            TextNode('alt', TextType.IMAGE, 'i.png'),
+        ]
+        doc = flatdoc.from_textnodes(nodes)
+        self.assertEqual(nodes, flatdoc.to_textnodes(doc))
+        self.assertEqual('see <b><a href="/d">docs</a>!</b><img src="i.png" alt="alt"></img>', flatdoc.to_html(doc))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, flatdoc.from_html_node, ParentNode('div', []))
+        self.assertRaises(ValueError, flatdoc.from_html_node, LeafNode('b', None))
+        doc = flatdoc.from_textnodes([TextNode('a', TextType.TEXT), TextNode('b', TextType.BOLD)])
+        self.assertRaises(ValueError, flatdoc.to_html_node, doc)
+        self.assertRaises(ValueError, flatdoc.to_textnodes, flatdoc.from_html_node(ParentNode('p', [LeafNode(None, 'a')])))
+
+    def test_block_cache(self):
+        markdown = 'Shared *footer*\n\nShared *footer*'
+        rendercache.enable(8)
+        try:
+            doc = flatdoc.from_markdown(markdown)
+        finally:
+            rendercache.disable()
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), flatdoc.to_html(doc))
+
+if __name__ == '__main__':
+    unittest.main()
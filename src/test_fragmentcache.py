@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+import rendercache
+from build import build_site
+from fragmentcache import FragmentCache
+from textnode import markdown_to_html_node
+
+class TestFragmentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'fragments')
+
+    def tearDown(self):
+        rendercache.disable()
+        self.tmp.cleanup()
+
+    def test_get_put(self):
+        cache = FragmentCache(self.directory, 1)
+        self.assertIsNone(cache.get('block', 'PARAGRAPH'))
+        cache.put('block', 'PARAGRAPH', '<p>block</p>')
+        self.assertEqual('<p>block</p>', cache.get('block', 'PARAGRAPH'))
+        self.assertEqual({'hits': 1, 'misses': 1, 'writes': 1}, cache.stats())
+
+    def test_shared_between_instances(self):
+        FragmentCache(self.directory, 1).put('block', 'PARAGRAPH', '<p>block</p>')
+        self.assertEqual('<p>block</p>', FragmentCache(self.directory, 1).get('block', 'PARAGRAPH'))
+
+    def test_key_includes_type_and_version(self):
+        cache = FragmentCache(self.directory, 1)
+        cache.put('block', 'PARAGRAPH', '<p>block</p>')
+        self.assertIsNone(cache.get('block', 'QUOTE'))
+        self.assertIsNone(FragmentCache(self.directory, 2).get('block', 'PARAGRAPH'))
+
+    def test_no_temp_files_left(self):
+        cache = FragmentCache(self.directory, 1)
+        cache.put('block', 'PARAGRAPH', '<p>block</p>')
+        for _, _, filenames in os.walk(self.directory):
+            self.assertFalse([name for name in filenames if name.startswith('.tmp-')])
+
+    def test_evict_least_recently_used(self):
+        cache = FragmentCache(self.directory, 1, max_bytes=250)
+        for idx in range(3):
+            cache.put(f'block{idx}', 'PARAGRAPH', 'x' * 100)
+            path = cache.path(cache.key(f'block{idx}', 'PARAGRAPH'))
+            os.utime(path, ns=(idx * 10**9, idx * 10**9))
+        self.assertEqual(1, cache.evict())
+        self.assertIsNone(cache.get('block0', 'PARAGRAPH'))
+        self.assertIsNotNone(cache.get('block1', 'PARAGRAPH'))
+        self.assertEqual(0, cache.evict())
+
+    def test_warm_render_uses_disk(self):
+        markdown = '# Title\n\nSome *text*\n\n* a\n* b'
+        expected = markdown_to_html_node(markdown).to_html()
+        rendercache.enable_disk(FragmentCache(self.directory, 1))
+        self.assertEqual(expected, markdown_to_html_node(markdown).to_html())
+        rendercache.enable_disk(FragmentCache(self.directory, 1))
+        self.assertEqual(expected, markdown_to_html_node(markdown).to_html())
+        self.assertEqual({'hits': 3, 'misses': 0, 'writes': 0}, rendercache.disk_cache.stats())
+    def test_build_evicts_only_after_writes(self):
+        root = self.tmp.name
+        content, static, template = (os.path.join(root, name) for name in ('content', 'static', 'template.html'))
+        os.makedirs(static)
+        for path, text in ((os.path.join(content, 'index.md'), '# Home\n\ntext'), (template, '{{ Content }}')):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as fp:
+                fp.write(text)
+
+        def build(max_bytes):
+            return build_site(content, static, template, os.path.join(root, 'public'),
+                              os.path.join(root, 'manifest.json'), fragment_cache=(self.directory, max_bytes))
+
+        def fragments():
+            return sum(len(filenames) for _, _, filenames in os.walk(self.directory))
+
+        build(1 << 20)
+        cached = fragments()
+        self.assertGreater(cached, 0)
+        # Nothing rendered, then only cache hits: nothing written to evict for
+        build(1)
+        os.remove(os.path.join(root, 'public', 'index.html'))
+        self.assertEqual(['index.md'], build(1)['rendered'])
+        self.assertEqual(cached, fragments())
+        with open(os.path.join(content, 'new.md'), 'w', encoding='utf-8') as fp:
+            fp.write('# New\n\nnew text')
+        build(1)
+        self.assertEqual(0, fragments())
+
+if __name__ == '__main__':
+    unittest.main()
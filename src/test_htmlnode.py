@@ -1,6 +1,10 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import io
+
+from htmlnode import (
+    HTMLNode, LeafNode, ParentNode, RawNode, SafeLeafNode, escape_attribute, escape_text, iter_html, start_tag, write_html,
+)
 
 class TestHTMLNode(unittest.TestCase):
     def test_init_default(self):
@@ -29,6 +33,11 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode(props=props)
         self.assertEqual(node.props_to_html(), ' href="https://www.google.com" target="_blank"')
 
+    def test_props_to_html_escapes(self):
+        node = HTMLNode(props={'title': 'a "b" & <c>', 'data-n': 1})
+        self.assertEqual(' title="a &quot;b&quot; &amp; &lt;c&gt;" data-n="1"', node.props_to_html())
+        self.assertEqual(start_tag('p', node.props), f'<p{node.props_to_html()}>')
+
     def test_props_to_html_no_props(self):
         node = HTMLNode()
         self.assertEqual(node.props_to_html(), '')
@@ -37,6 +46,27 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode(props=dict())
         self.assertEqual(node.props_to_html(), '')
 
+    def test_init_copies(self):
+        children = [LeafNode('b', 'Bold')]
+        props = {'class': 'x'}
+        node = HTMLNode('p', None, children, props)
+        self.assertIsNot(node.children, children)
+        self.assertIsNot(node.props, props)
+
+    def test_owned_does_not_copy(self):
+        children = [LeafNode('b', 'Bold')]
+        props = {'class': 'x'}
+        node = ParentNode._owned('p', children, props)
+        self.assertIsInstance(node, ParentNode)
+        self.assertIs(node.children, children)
+        self.assertIs(node.props, props)
+        self.assertIsNone(node.value)
+        self.assertEqual('<p class="x"><b>Bold</b></p>', node.to_html())
+
+    def test_slots(self):
+        for node in (HTMLNode(), LeafNode('b', 'Bold'), ParentNode('p', [LeafNode('b', 'Bold')])):
+            self.assertFalse(hasattr(node, '__dict__'))
+
 class TestLeafNode(unittest.TestCase):
     def test_init_default(self):
         self.assertRaises(TypeError, LeafNode)
@@ -63,6 +93,22 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("a", "Click me!", {"href": "https://www.google.com"})
         self.assertEqual(node.to_html(), '<a href="https://www.google.com">Click me!</a>')
 
+    def test_to_html_props_shapes(self):
+        first = LeafNode('a', 'one', {'href': 'url1'})
+        second = LeafNode('a', 'two', {'href': 'url2'})
+        reordered = LeafNode('img', '', {'alt': 'x', 'src': 'y'})
+        self.assertEqual('<a href="url1">one</a>', first.to_html())
+        self.assertEqual('<a href="url2">two</a>', second.to_html())
+        self.assertEqual('<img alt="x" src="y"></img>', reordered.to_html())
+        self.assertEqual('<img src="y" alt="x"></img>', LeafNode('img', '', {'src': 'y', 'alt': 'x'}).to_html())
+
+    def test_to_html_braces(self):
+        node = LeafNode('{b}', '{value}', {'data-{x}': '{0}'})
+        self.assertEqual('<{b} data-{x}="{0}">{value}</{b}>', node.to_html())
+
+    def test_to_html_non_string_value(self):
+        self.assertEqual('<b>5</b>', LeafNode('b', 5).to_html())
+
 class TestParentNode(unittest.TestCase):
     def test_init_default(self):
         self.assertRaises(TypeError, ParentNode)
@@ -172,4 +218,81 @@ class TestParentNode(unittest.TestCase):
         self.assertEqual(
             '<OUTER PARENT><OUTER CHILD 1>1</OUTER CHILD 1><INNER PARENT><INNER CHILD 1>1</INNER CHILD 1><INNER CHILD 2>2</INNER CHILD 2></INNER PARENT></OUTER PARENT>',
             outer_parent.to_html()
-        )
\ No newline at end of file
+        )
+
+class TestStreamingSerializer(unittest.TestCase):
+    def make_tree(self):
+        return ParentNode(
+            'div',
+            [
+                ParentNode('p', [LeafNode('b', 'Bold'), LeafNode(None, ' text')]),
+                LeafNode('a', 'link', {'href': 'url'}),
+            ],
+        )
+
+    def test_iter_html_matches_to_html(self):
+        node = self.make_tree()
+        self.assertEqual(
+            '<div><p><b>Bold</b> text</p><a href="url">link</a></div>',
+            ''.join(iter_html(node))
+        )
+        self.assertEqual(''.join(iter_html(node)), node.to_html())
+
+    def test_write_html(self):
+        fp = io.StringIO()
+        write_html(self.make_tree(), fp)
+        self.assertEqual(self.make_tree().to_html(), fp.getvalue())
+
+    def test_iter_html_leaf(self):
+        self.assertEqual(['<i>Italic</i>'], list(iter_html(LeafNode('i', 'Italic'))))
+
+    def test_parent_props(self):
+        node = ParentNode('ul', [LeafNode('li', 'item')], {'class': 'list'})
+        self.assertEqual('<ul class="list"><li>item</li></ul>', node.to_html())
+
+    def test_deep_tree(self):
+        depth = 10000
+        node = LeafNode(None, 'deep')
+        for _ in range(depth):
+            node = ParentNode('blockquote', [node])
+        html = node.to_html()
+        self.assertEqual('<blockquote>' * depth + 'deep' + '</blockquote>' * depth, html)
+
+    def test_nested_empty_children(self):
+        node = ParentNode('div', [ParentNode('p', [])])
+        with self.assertRaises(ValueError) as cm:
+            node.to_html()
+        self.assertEqual('ParentNode.children should not be empty', str(cm.exception))
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual('a &lt;b&gt; &amp; "c"', escape_text('a <b> & "c"'))
+
+    def test_escape_text_fast_path(self):
+        text = 'nothing to escape here'
+        self.assertIs(text, escape_text(text))
+
+    def test_escape_attribute(self):
+        self.assertEqual('a &quot;b&quot; &amp;&lt;&gt;', escape_attribute('a "b" &<>'))
+        value = '/plain/url'
+        self.assertIs(value, escape_attribute(value))
+
+    def test_leaf_escapes(self):
+        node = LeafNode('a', '1 < 2', {'href': '/q?a=1&b="2"'})
+        self.assertEqual('<a href="/q?a=1&amp;b=&quot;2&quot;">1 &lt; 2</a>', node.to_html())
+        self.assertEqual('&lt;script&gt;', LeafNode(None, '<script>').to_html())
+
+    def test_parent_props_escape(self):
+        node = ParentNode('div', [LeafNode(None, 'x')], {'title': '"quoted"'})
+        self.assertEqual('<div title="&quot;quoted&quot;">x</div>', node.to_html())
+
+    def test_raw_node(self):
+        node = ParentNode('div', [RawNode('<p>trusted</p>'), LeafNode(None, '<p>')])
+        self.assertEqual('<div><p>trusted</p>&lt;p&gt;</div>', node.to_html())
+        self.assertRaises(ValueError, RawNode(None).to_html)
+
+    def test_safe_leaf_node(self):
+        node = SafeLeafNode('a', 'click', {'href': '/x'})
+        self.assertEqual('<a href="/x">click</a>', node.to_html())
+        self.assertEqual('<b>bold</b>', SafeLeafNode('b', 'bold').to_html())
+        self.assertRaises(ValueError, SafeLeafNode('b', None).to_html)
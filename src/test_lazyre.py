@@ -0,0 +1,18 @@
+import unittest
+
+from lazyre import LazyPattern
+
+class TestLazyPattern(unittest.TestCase):
+    def test_compiles_on_first_use(self):
+        pattern = LazyPattern(r'(?i)<(/?)(pre)\b')
+        self.assertIsNone(pattern.compiled)
+        match = pattern.search('a <PRE> b')
+        self.assertEqual(('', 'PRE'), match.groups())
+        compiled = pattern.compiled
+        self.assertEqual(['/'], [match.group(1) for match in pattern.finditer('</pre>')])
+        self.assertIs(compiled, pattern.compiled)
+        self.assertEqual(2, pattern.groups)
+        self.assertEqual(compiled.search, pattern.__dict__['search'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+import linkindex
+import rendercache
+from linkindex import LinkIndex, internal_path, url_candidates
+from textnode import markdown_to_html_node
+
+class TestLinkIndex(unittest.TestCase):
+    def test_set_links_and_referrers(self):
+        index = LinkIndex()
+        index.set_links('a.md', [('link', '/b'), ('image', '/img.png')])
+        index.set_links('c.md', [('link', '/b')])
+        self.assertEqual(['a.md', 'c.md'], index.referrers('/b'))
+        index.set_links('a.md', [('link', '/c')])
+        self.assertEqual(['c.md'], index.referrers('/b'))
+        self.assertEqual([], index.referrers('/img.png'))
+        index.remove('c.md')
+        self.assertNotIn('/b', index.targets)
+
+    def test_check(self):
+        index = LinkIndex()
+        index.set_links('index.md', [
+            ('link', '/blog/post'),
+            ('link', 'blog/post.html#section'),
+            ('link', 'https://boot.dev'),
+            ('link', '#top'),
+            ('link', 'mailto:me@example.com'),
+            ('link', '/missing'),
+            ('image', '/images/cat.png'),
+            ('image', '/images/dog.png'),
+        ])
+        index.set_links('blog/post.md', [('link', '../index.html'), ('link', 'other')])
+        outputs = {'index.html', 'blog/post.html', 'images/cat.png'}
+        source_outputs = {'index.md': 'index.html', 'blog/post.md': 'blog/post.html'}
+        self.assertEqual(
+            [
+                ('blog/post.md', 'link', 'other'),
+                ('index.md', 'image', '/images/dog.png'),
+                ('index.md', 'link', '/missing'),
+            ],
+            index.check(outputs, source_outputs)
+        )
+
+    def test_internal_path(self):
+        self.assertEqual('/a b', internal_path('/a%20b?x=1'))
+        self.assertIsNone(internal_path('https://example.com/'))
+        self.assertIsNone(internal_path('#anchor'))
+
+    def test_url_candidates(self):
+        self.assertEqual(['index.html'], url_candidates('/'))
+        self.assertEqual(['blog/index.html'], url_candidates('/blog/'))
+        self.assertEqual(['a', 'a.html', 'a/index.html'], url_candidates('/x/../a'))
+
+class TestLinkCollection(unittest.TestCase):
+    markdown = '# Title\n\nA [link](/a) and ![img](/i.png)\n\n* [item](/b)'
+    expected = [('link', '/a'), ('image', '/i.png'), ('link', '/b')]
+
+    def tearDown(self):
+        linkindex.finish()
+        rendercache.disable()
+
+    def test_not_collecting(self):
+        markdown_to_html_node(TestLinkCollection.markdown)
+        self.assertIsNone(linkindex.current)
+
+    def test_collects_in_render_pass(self):
+        linkindex.start()
+        markdown_to_html_node(TestLinkCollection.markdown)
+        self.assertEqual(TestLinkCollection.expected, linkindex.finish())
+
+    def test_repeated_links_collected_once(self):
+        linkindex.start()
+        markdown_to_html_node(TestLinkCollection.markdown + '\n\nAgain [link](/a)')
+        self.assertEqual(TestLinkCollection.expected, linkindex.finish())
+
+    def test_cached_blocks_replay_links(self):
+        rendercache.enable(8)
+        for _ in range(2):
+            linkindex.start()
+            markdown_to_html_node(TestLinkCollection.markdown)
+            self.assertEqual(TestLinkCollection.expected, linkindex.finish())
+        self.assertEqual(3, rendercache.block_cache.hits)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import io
+import os
+import pickle
+import tempfile
+import unittest
+
+from pagetemplate import Template, load_template
+
+class TestTemplate(unittest.TestCase):
+    def test_parse(self):
+        template = Template('<title>{{ Title }}</title>{{Content}}<p>end</p>')
+        self.assertEqual(('<title>', '</title>', '<p>end</p>'), template.segments)
+        self.assertEqual(('Title', 'Content'), template.slots)
+
+    def test_render(self):
+        template = Template('<title>{{ Title }}</title><main>{{ Content }}</main>')
+        self.assertEqual(
+            '<title>Home</title><main><p>hi</p></main>',
+            template.render({'Title': 'Home', 'Content': '<p>hi</p>'})
+        )
+
+    def test_missing_slot_kept(self):
+        template = Template('{{ Title }} {{ TOC }}')
+        self.assertEqual('Home {{ TOC }}', template.render({'Title': 'Home'}))
+
+    def test_values_not_rescanned(self):
+        template = Template('{{ Title }}|{{ Content }}')
+        self.assertEqual('{{ Content }}|body', template.render({'Title': '{{ Content }}', 'Content': 'body'}))
+
+    def test_write_streams_iterables(self):
+        template = Template('<a>{{ Title }}</a>{{ Content }}!')
+        fp = io.StringIO()
+        template.write(fp, {'Title': 'T', 'Content': iter(['<p>', 'x', '</p>'])})
+        self.assertEqual('<a>T</a><p>x</p>!', fp.getvalue())
+        self.assertEqual(fp.getvalue(), template.render({'Title': 'T', 'Content': ['<p>', 'x', '</p>']}))
+
+    def test_no_slots(self):
+        template = Template('plain')
+        self.assertEqual('plain', template.render({'Title': 'x'}))
+
+    def test_pickles(self):
+        template = Template('<b>{{ Title }}</b>')
+        copy = pickle.loads(pickle.dumps(template))
+        self.assertEqual(template.render({'Title': 'x'}), copy.render({'Title': 'x'}))
+
+    def test_load_template_reloads_on_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'template.html')
+            with open(path, 'w', encoding='utf-8') as fp:
+                fp.write('<b>{{ Title }}</b>')
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+            with open(path, 'w', encoding='utf-8') as fp:
+                fp.write('<i>{{ Title }}</i>')
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            second = load_template(path)
+            self.assertIsNot(first, second)
+            self.assertEqual('<i>x</i>', second.render({'Title': 'x'}))
+
+if __name__ == '__main__':
+    unittest.main()
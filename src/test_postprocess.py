@@ -0,0 +1,105 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+import postprocess
+from postprocess import Minifier, PageWriter
+
+def minify(*chunks):
+    minifier = Minifier()
+    return ''.join(minifier.feed(chunk) for chunk in chunks) + minifier.flush()
+
+class TestMinifier(unittest.TestCase):
+    def test_collapses_whitespace(self):
+        self.assertEqual(
+            '<html> <body> <p>a b</p> </body> </html> ',
+            minify('<html>\n  <body>\n    <p>a \t\n b</p>\n  </body>\n</html>\n')
+        )
+
+    def test_keeps_non_breaking_space(self):
+        self.assertEqual('<p>a \xa0 b</p>', minify('<p>a \xa0\n b</p>'))
+
+    def test_preserves_pre_and_code(self):
+        html = '<p>x  y</p><pre><code>def f():\n    return  1\n</code></pre>\n\n<p>inline <code>a  b</code>  c</p>'
+        self.assertEqual(
+            '<p>x y</p><pre><code>def f():\n    return  1\n</code></pre> <p>inline <code>a  b</code> c</p>',
+            minify(html)
+        )
+
+    def test_preserves_script_case_insensitive(self):
+        self.assertEqual('<SCRIPT>// a\nb()</SCRIPT> x', minify('<SCRIPT>// a\nb()</SCRIPT>\n  x'))
+
+    def test_keeps_whitespace_inside_tags(self):
+        self.assertEqual(
+            '<img alt="x    y" src="a\tb"> <p\n  class="c">t u</p>',
+            minify('<img alt="x    y" src="a\tb">\n  <p\n  class="c">t  u</p>')
+        )
+
+    def test_quoted_angle_bracket(self):
+        html = '<a title="p > q  r">a  b</a>\n'
+        self.assertEqual('<a title="p > q  r">a b</a> ', minify(html))
+        for size in range(1, 8):
+            chunks = [html[pos:pos + size] for pos in range(0, len(html), size)]
+            with self.subTest(size=size):
+                self.assertEqual(minify(html), minify(*chunks))
+
+    def test_chunks_match_whole(self):
+        html = '<div>\n  <pre class="x">a\n  b</pre>\n  <img alt="u  v">\n  <p>c   d</p>\n</div>\n'
+        whole = minify(html)
+        for size in range(1, 8):
+            chunks = [html[pos:pos + size] for pos in range(0, len(html), size)]
+            with self.subTest(size=size):
+                self.assertEqual(whole, minify(*chunks))
+
+class TestPageWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'out', 'page.html')
+
+    def tearDown(self):
+        postprocess.disable()
+        self.tmp.cleanup()
+
+    def write(self, *chunks):
+        with PageWriter(self.path) as fp:
+            for chunk in chunks:
+                fp.write(chunk)
+
+    def test_writes_minified_page_and_gz(self):
+        postprocess.enable(minify=True, precompress=True)
+        self.write('<p>a\n', '  b</p>\n')
+        with open(self.path, encoding='utf-8') as fp:
+            self.assertEqual('<p>a b</p> ', fp.read())
+        with gzip.open(self.path + '.gz', 'rt', encoding='utf-8') as fp:
+            self.assertEqual('<p>a b</p> ', fp.read())
+        stats = postprocess.stats()
+        self.assertEqual((1, 0), (stats['pages'], stats['unchanged']))
+        self.assertEqual((13, 11, 11), (stats['chars_in'], stats['chars_out'], stats['bytes']))
+
+    def test_unchanged_content_is_not_rewritten(self):
+        postprocess.enable(precompress=True)
+        self.write('<p>same</p>')
+        gz_mtime = os.stat(self.path + '.gz').st_mtime_ns
+        os.utime(self.path + '.gz', ns=(gz_mtime - 10**9, gz_mtime - 10**9))
+        self.write('<p>same</p>')
+        self.assertEqual(gz_mtime - 10**9, os.stat(self.path + '.gz').st_mtime_ns)
+        self.assertEqual(1, postprocess.stats()['unchanged'])
+        self.write('<p>changed</p>')
+        with gzip.open(self.path + '.gz', 'rt', encoding='utf-8') as fp:
+            self.assertEqual('<p>changed</p>', fp.read())
+        self.assertEqual(['page.html', 'page.html.gz'], sorted(os.listdir(os.path.dirname(self.path))))
+
+    def test_error_leaves_output_alone(self):
+        postprocess.enable(minify=True)
+        self.write('<p>good</p>')
+        with self.assertRaises(RuntimeError):
+            with PageWriter(self.path) as fp:
+                fp.write('<p>half')
+                raise RuntimeError('render failed')
+        with open(self.path, encoding='utf-8') as fp:
+            self.assertEqual('<p>good</p>', fp.read())
+        self.assertEqual(['page.html'], os.listdir(os.path.dirname(self.path)))
+
+if __name__ == '__main__':
+    unittest.main()
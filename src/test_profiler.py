@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+import build
+import postprocess
+import profiler
+import textnode
+from htmlnode import ParentNode
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self):
+        profiler.uninstall()
+
+    def test_install_and_uninstall(self):
+        original = textnode.text_to_textnodes
+        original_to_html = ParentNode.to_html
+        profiler.install()
+        self.assertIsNot(original, textnode.text_to_textnodes)
+        profiler.uninstall()
+        self.assertIs(original, textnode.text_to_textnodes)
+        self.assertIs(original_to_html, ParentNode.to_html)
+        self.assertIsNone(profiler.snapshot())
+
+    def test_records_stages(self):
+        profiler.install()
+        html = textnode.markdown_to_html_node('# Title\n\nSome **bold** text').to_html()
+        stages = profiler.snapshot()['stages']
+        self.assertEqual({'calls': 1, 'nodes': 2}, {k: stages['markdown_to_blocks'][k] for k in ('calls', 'nodes')})
+        self.assertEqual(2, stages['text_to_textnodes']['calls'])
+        self.assertEqual(4, stages['text_node_to_html_node']['nodes'])
+        self.assertEqual(len(html), stages['to_html']['bytes'])
+
+    def test_records_pages(self):
+        profiler.install()
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'page.md')
+            with open(source, 'w', encoding='utf-8') as fp:
+                fp.write('# Page\n\ntext')
+            build.render_page_file(source, os.path.join(tmp, 'out', 'page.html'), '{{ Content }}')
+        snap = profiler.snapshot()
+        self.assertEqual([source], [page[0] for page in snap['pages']])
+        self.assertEqual(1, snap['stages']['read']['calls'])
+        self.assertEqual(len('<div><h1 id="page">Page</h1><p>text</p></div>'), snap['stages']['write']['bytes'])
+
+    def test_records_streamed_pages(self):
+        profiler.install()
+        html = '<div><h1 id="page">Page</h1><p>text</p></div>'
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'page.md')
+            with open(source, 'w', encoding='utf-8') as fp:
+                fp.write('# Page\n\ntext')
+            for post in (None, {'minify': True}):
+                if post is not None:
+                    postprocess.enable(**post)
+                try:
+                    build.render_page_file(source, os.path.join(tmp, 'out', 'page.html'), '{{ Content }}', stream=True)
+                finally:
+                    postprocess.disable()
+                stages = profiler.snapshot()['stages']
+                with self.subTest(post=post):
+                    self.assertEqual(2, stages['markdown_to_blocks']['nodes'])
+                    self.assertEqual(2, stages['block_to_block_type']['nodes'])
+                    self.assertEqual(len(html), stages['write']['bytes'])
+                profiler.uninstall()
+                profiler.install()
+
+    def test_merge(self):
+        first = {'stages': {'read': {'calls': 1, 'nodes': 0, 'bytes': 10, 'seconds': 0.5}}, 'pages': [['a.md', 0.5]]}
+        second = {'stages': {'read': {'calls': 2, 'nodes': 0, 'bytes': 5, 'seconds': 0.25}}, 'pages': [['b.md', 0.25]]}
+        merged = profiler.merge([first, None, second])
+        self.assertEqual({'calls': 3, 'nodes': 0, 'bytes': 15, 'seconds': 0.75}, merged['stages']['read'])
+        self.assertEqual([('a.md', 0.5), ('b.md', 0.25)], merged['pages'])
+        report = profiler.format_report(merged)
+        self.assertIn('read', report)
+        self.assertIn('a.md', report)
+
+if __name__ == '__main__':
+    unittest.main()
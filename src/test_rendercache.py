@@ -0,0 +1,69 @@
+import unittest
+
+import rendercache
+from rendercache import LRUCache, merge_stats
+from textnode import TextNode, TextType, markdown_to_html_node, text_to_textnodes
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        self.assertEqual(1, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual({'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1, 'maxsize': 2}, cache.stats())
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(1, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual(1, cache.stats()['evictions'])
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, LRUCache, 0)
+
+    def test_merge_stats(self):
+        first = {'inline': {'hits': 1, 'misses': 2}, 'block': None}
+        second = {'inline': {'hits': 3, 'misses': 4}, 'block': None}
+        self.assertEqual({'inline': {'hits': 4, 'misses': 6}}, merge_stats([first, second]))
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        rendercache.enable(16)
+
+    def tearDown(self):
+        rendercache.disable()
+
+    def test_inline_hit_returns_fresh_nodes(self):
+        first = text_to_textnodes('a **bold** word')
+        first[1].text = 'corrupted'
+        second = text_to_textnodes('a **bold** word')
+        self.assertEqual(TextNode('bold', TextType.BOLD), second[1])
+        self.assertIsNot(first[0], second[0])
+        self.assertEqual(1, rendercache.inline_cache.hits)
+
+    def test_inline_hit_keeps_nesting(self):
+        first = text_to_textnodes('*an **important** point*')
+        second = text_to_textnodes('*an **important** point*')
+        self.assertEqual(first, second)
+        self.assertIsNot(first[0].children, second[0].children)
+        self.assertEqual(1, rendercache.inline_cache.hits)
+
+    def test_block_cache_output_matches(self):
+        markdown = '# Title\n\nShared *footer*\n\n* a\n* b\n\nShared *footer*'
+        cached = markdown_to_html_node(markdown).to_html()
+        rendercache.disable()
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), cached)
+
+    def test_block_cache_keyed_by_type(self):
+        markdown_to_html_node('Shared *footer*\n\nShared *footer*')
+        stats = rendercache.block_cache.stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+
+if __name__ == '__main__':
+    unittest.main()
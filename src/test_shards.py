@@ -0,0 +1,191 @@
+import json
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from build import build_site, list_files, shard_of
+from shards import SHARD_MANIFEST, SHARD_PUBLIC, find_shards, merge_shards, parse_shard, shard_path
+from sitefixture import SiteTestCase
+
+COUNT = 3
+
+def build_shard(args):
+    # Runs in its own process, standing in for one build machine
+    content, static, template, shards_dir, index, count, precompress = args
+    directory = shard_path(shards_dir, index, count)
+    stats = build_site(
+        content, static, template, os.path.join(directory, SHARD_PUBLIC),
+        os.path.join(directory, SHARD_MANIFEST), shard=(index, count), precompress=precompress
+    )
+    return stats['rendered'] + stats['copied']
+
+class TestShards(SiteTestCase):
+    files = {
+        'content/index.md': '# Home\n\nWelcome **home**',
+        'static/styles.css': 'body {}',
+        'static/images/logo.png': 'png',
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.shards = os.path.join(self.tmp.name, 'shards')
+        for idx in range(12):
+            self.write(
+                os.path.join(self.content, 'many', f'page{idx}.md'),
+                f'# Page {idx}\n\n[next](/many/page{idx + 1}) and [home](/)'
+            )
+
+    def build_shards(self, count=COUNT, precompress=False):
+        tasks = [
+            (self.content, self.static, self.template, self.shards, index, count, precompress)
+            for index in range(count)
+        ]
+        with ProcessPoolExecutor(max_workers=count) as executor:
+            return list(executor.map(build_shard, tasks))
+
+    def merge(self, count=None, **kwargs):
+        return merge_shards(find_shards(self.shards, count), self.public, self.manifest, **kwargs)
+
+    def read_tree(self, root):
+        files = {}
+        for path in list_files(root):
+            with open(os.path.join(root, path), encoding='utf-8') as fp:
+                files[path] = fp.read()
+        return files
+
+    def test_parse_shard(self):
+        self.assertEqual((0, 1), parse_shard('0/1'))
+        self.assertEqual((2, 4), parse_shard('2/4'))
+        for text in ('4/4', '1', 'a/2', '-1/2', '0/0'):
+            with self.subTest(text=text):
+                self.assertRaises(ValueError, parse_shard, text)
+        with self.assertRaisesRegex(ValueError, 'count should be at least 1'):
+            parse_shard('1/0')
+
+    def test_shard_of_is_stable(self):
+        # Fixed values, so a change in the hash shows up here rather than as
+        # shards that disagree across machines
+        self.assertEqual([0, 1, 2], [shard_of(source, 3) for source in ('index.md', 'styles.css', 'about.md')])
+
+    def test_merge_matches_single_build(self):
+        built = self.build_shards()
+        sources = [source for shard in built for source in shard]
+        self.assertEqual(len(sources), len(set(sources)))
+        self.assertEqual(15, len(sources))
+        self.assertTrue(all(built))
+
+        stats = self.merge(check_links=True)
+        self.assertEqual(15, len(stats['copied']))
+        self.assertEqual(COUNT, stats['shards'])
+        self.assertEqual([('many/page11.md', 'link', '/many/page12')], stats['broken'])
+
+        single_public = os.path.join(self.tmp.name, 'single')
+        build_site(self.content, self.static, self.template, single_public, os.path.join(self.tmp.name, 'single.json'))
+        self.assertEqual(self.read_tree(single_public), self.read_tree(self.public))
+
+        # The merged manifest is a plain build manifest for the whole site
+        with open(self.manifest, encoding='utf-8') as fp:
+            manifest = json.load(fp)
+        self.assertNotIn('shard', manifest)
+        self.assertEqual(13, len(manifest['pages']))
+        self.assertEqual([['link', '/many/page1'], ['link', '/']], manifest['pages']['many/page0.md']['links'])
+
+    def test_incremental_merge(self):
+        self.build_shards()
+        self.merge()
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nEdited')
+        os.remove(os.path.join(self.content, 'many', 'page3.md'))
+        self.build_shards()
+        stats = self.merge()
+        self.assertEqual(['index.html'], stats['copied'])
+        self.assertEqual(['many/page3.html'], stats['deleted'])
+        self.assertEqual(13, stats['skipped'])
+        self.assertIn('<p>Edited</p>', self.read_tree(self.public)['index.html'])
+
+        # A page rebuilt to the same HTML isn't copied again
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nEdited\n')
+        self.build_shards()
+        stats = self.merge()
+        self.assertEqual([], stats['copied'])
+        self.assertEqual(14, stats['skipped'])
+
+    def test_precompressed_shards(self):
+        self.build_shards(precompress=True)
+        self.merge()
+        files = list_files(self.public)
+        self.assertIn('index.html.gz', files)
+        self.assertEqual(13, sum(path.endswith('.html.gz') for path in files))
+        self.assertNotIn('styles.css.gz', files)
+
+        self.build_shards()
+        stats = self.merge()
+        self.assertEqual(13, len(stats['copied']))
+        self.assertFalse(any(path.endswith('.gz') for path in list_files(self.public)))
+
+    def test_missing_shard(self):
+        self.build_shards()
+        with self.assertRaisesRegex(ValueError, r'missing \[1\]'):
+            merge_shards(
+                [shard_path(self.shards, 0, COUNT), shard_path(self.shards, 2, COUNT)], self.public, self.manifest
+            )
+
+    def test_mixed_shard_counts(self):
+        self.build_shards()
+        self.build_shards(count=2)
+        with self.assertRaisesRegex(ValueError, 'different shard counts'):
+            self.merge()
+
+    def test_reshard_and_merge(self):
+        self.build_shards()
+        self.merge(COUNT)
+        expected = self.read_tree(self.public)
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nResharded')
+        self.build_shards(count=2)
+        self.assertEqual(COUNT + 2, len(find_shards(self.shards)))
+        self.assertEqual(2, len(find_shards(self.shards, 2)))
+        stats = self.merge(2)
+        self.assertEqual(2, stats['shards'])
+        self.assertEqual(['index.html'], stats['copied'])
+        expected['index.html'] = expected['index.html'].replace('Welcome <b>home</b>', 'Resharded')
+        self.assertEqual(expected, self.read_tree(self.public))
+
+    def test_mixed_renderer_versions(self):
+        self.build_shards()
+        path = os.path.join(shard_path(self.shards, 0, COUNT), SHARD_MANIFEST)
+        with open(path, encoding='utf-8') as fp:
+            manifest = json.load(fp)
+        manifest['renderer'] -= 1
+        with open(path, 'w', encoding='utf-8') as fp:
+            json.dump(manifest, fp)
+        with self.assertRaisesRegex(ValueError, 'different renderer versions'):
+            self.merge()
+
+    def test_missing_output(self):
+        self.build_shards()
+        directory = shard_path(self.shards, shard_of('index.md', COUNT), COUNT)
+        os.remove(os.path.join(directory, SHARD_PUBLIC, 'index.html'))
+        with self.assertRaisesRegex(ValueError, 'missing output index.html'):
+            self.merge()
+        self.assertFalse(os.path.exists(self.public))
+
+    def test_source_in_wrong_shard(self):
+        self.build_shards()
+        owner = shard_of('index.md', COUNT)
+        other = (owner + 1) % COUNT
+        with open(os.path.join(shard_path(self.shards, owner, COUNT), SHARD_MANIFEST), encoding='utf-8') as fp:
+            entry = json.load(fp)['pages']['index.md']
+        path = os.path.join(shard_path(self.shards, other, COUNT), SHARD_MANIFEST)
+        with open(path, encoding='utf-8') as fp:
+            manifest = json.load(fp)
+        manifest['pages']['index.md'] = entry
+        with open(path, 'w', encoding='utf-8') as fp:
+            json.dump(manifest, fp)
+        with self.assertRaisesRegex(ValueError, f'index.md belongs to shard {owner}'):
+            self.merge()
+
+    def test_shard_rejects_check_links(self):
+        with self.assertRaises(ValueError):
+            build_site(self.content, self.static, self.template, self.public, self.manifest, shard=(0, 2), check_links=True)
+
+if __name__ == '__main__':
+    unittest.main()
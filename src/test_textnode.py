@@ -1,5 +1,10 @@
+import io
+import mmap
+import random
+import tempfile
 import unittest
 
+from corpus import make_document, make_link_adversarial, make_paragraph
 from textnode import *
 
 
@@ -67,11 +72,22 @@ class Test_text_node_to_html_node(unittest.TestCase):
         node = TextNode('TEXT', None)
         self.assertRaises(ValueError, text_node_to_html_node, node)
 
+    def test_emphasis(self):
+        nodes = text_to_textnodes('x **a [b](c)** y')
+        html = [text_node_to_html_node(node) for node in nodes]
+        self.assertIsInstance(html[1], ParentNode)
+        self.assertEqual('b', html[1].tag)
+        self.assertEqual('x <b>a <a href="c">b</a></b> y', ''.join(node.to_html() for node in html))
+        nested = text_node_to_html_node(EmphasisNode(TextType.ITALIC, [EmphasisNode(TextType.BOLD, [
+            TextNode('1 < 2', TextType.TEXT), TextNode('c', TextType.CODE),
+        ])]))
+        self.assertEqual('<i><b>1 &lt; 2<code>c</code></b></i>', nested.to_html())
+
     def test_incorrect_text_type(self):
         node = TextNode('TEXT', 69420)
         self.assertRaises(ValueError, text_node_to_html_node, node)
 
-class Test_text_node_to_html_node(unittest.TestCase):
+class Test_split_nodes_delimiter(unittest.TestCase):
     def test_bold(self):
         node = TextNode('This is text with a **bolded phrase** in the middle', TextType.TEXT)
         nodes = split_nodes_delimiter([node], '**', TextType.BOLD)
@@ -168,6 +184,47 @@ class Test_extract_markdown_links(unittest.TestCase):
         matches = extract_markdown_links(text)
         self.assertEqual(matches, [("to boot dev", "https://www.boot.dev"), ("to youtube", "https://www.youtube.com/@bootdotdev")])
 
+class Test_link_scanner(unittest.TestCase):
+    def test_near_miss_keeps_text(self):
+        created = split_nodes_link([TextNode('see [a] (b) and [c](d) too', TextType.TEXT)])
+        expected = [
+            TextNode('see [a] (b) and ', TextType.TEXT),
+            TextNode('c', TextType.LINK, 'd'),
+            TextNode(' too', TextType.TEXT),
+        ]
+        self.assertEqual(expected, created)
+
+    def test_broken_image_keeps_text(self):
+        created = split_nodes_image([TextNode('![a] x) ![b](c)', TextType.TEXT)])
+        expected = [
+            TextNode('![a] x) ', TextType.TEXT),
+            TextNode('b', TextType.IMAGE, 'c'),
+        ]
+        self.assertEqual(expected, created)
+
+    def test_fuzz_scanners_agree(self):
+        # Splitting, extracting and the single-scan tokenizer must find the
+        # same links on broken input, and splitting must not lose text
+        for seed in range(200):
+            text = make_link_adversarial(random.Random(seed), 200)
+            with self.subTest(seed=seed):
+                nodes = split_nodes_link(split_nodes_image([TextNode(text, TextType.TEXT)]))
+                self.assertEqual(nodes, tokenize_inline(text))
+                self.assertEqual(
+                    extract_markdown_images(text),
+                    [(node.text, node.url) for node in nodes if node.text_type is TextType.IMAGE],
+                )
+                self.assertEqual(
+                    extract_markdown_links(text),
+                    [(node.text, node.url) for node in nodes if node.text_type is TextType.LINK],
+                )
+
+    def test_fuzz_normal_input(self):
+        for seed in range(50):
+            text = make_paragraph(random.Random(seed), 100, 0.3)
+            with self.subTest(seed=seed):
+                self.assertEqual(text_to_textnodes_multipass(text), tokenize_inline(text))
+
 class Test_split_nodes_link(unittest.TestCase):
     link_node = TextNode(
         "This is text with a link [to boot dev](https://www.boot.dev) and [to youtube](https://www.youtube.com/@bootdotdev)",
@@ -286,6 +343,117 @@ class Test_text_to_textnodes(unittest.TestCase):
         ]
         self.assertEqual(expected, created)
 
+class Test_tokenize_inline(unittest.TestCase):
+    texts = [
+        Test_text_to_textnodes.text,
+        "Plain text with nothing special in it",
+        "**bold at start** then text",
+        "text then *italic at end*",
+        "`code` with [a link](https://boot.dev) and ![an image](img.png)",
+        "[oops](url1)[all](url2)[links!](url3)",
+        "![oops](url1)![all](url2)![images!](url3)",
+        "Multi line **bold**\nand *italic*\nparagraph",
+        "Exclamation! then [link](url) and more",
+    ]
+
+    def test_matches_multipass(self):
+        for text in Test_tokenize_inline.texts:
+            with self.subTest(text=text):
+                self.assertEqual(text_to_textnodes_multipass(text), tokenize_inline(text))
+
+    def test_unclosed_delimiter_is_literal(self):
+        created = tokenize_inline('2 * 3 = 6 and **bold**')
+        expected = [
+            TextNode('2 * 3 = 6 and ', TextType.TEXT),
+            TextNode('bold', TextType.BOLD),
+        ]
+        self.assertEqual(expected, created)
+
+    def test_code_is_not_split(self):
+        created = tokenize_inline('`a*b*c`')
+        self.assertEqual([TextNode('a*b*c', TextType.CODE)], created)
+
+    def test_unmatched_image_is_not_a_link(self):
+        created = tokenize_inline('![alt](url and [link](url2)')
+        expected = [
+            TextNode('![alt](url and ', TextType.TEXT),
+            TextNode('link', TextType.LINK, url='url2'),
+        ]
+        self.assertEqual(expected, created)
+
+    def test_bold_inside_italic(self):
+        created = tokenize_inline('*an **important** point*')
+        expected = [
+            EmphasisNode(TextType.ITALIC, [
+                TextNode('an ', TextType.TEXT),
+                TextNode('important', TextType.BOLD),
+                TextNode(' point', TextType.TEXT),
+            ]),
+        ]
+        self.assertEqual(expected, created)
+
+    def test_triple_run(self):
+        created = tokenize_inline('***both*** and ***more* here**')
+        expected = [
+            EmphasisNode(TextType.BOLD, [TextNode('both', TextType.ITALIC)]),
+            TextNode(' and ', TextType.TEXT),
+            EmphasisNode(TextType.BOLD, [
+                TextNode('more', TextType.ITALIC),
+                TextNode(' here', TextType.TEXT),
+            ]),
+        ]
+        self.assertEqual(expected, created)
+
+    def test_triple_run_split_by_closers(self):
+        # A *** opener gives its inner ** or * to whichever closer comes first
+        created = tokenize_inline('***a** b*')
+        expected = [
+            EmphasisNode(TextType.ITALIC, [
+                TextNode('a', TextType.BOLD),
+                TextNode(' b', TextType.TEXT),
+            ]),
+        ]
+        self.assertEqual(expected, created)
+        created = tokenize_inline('***a* b**')
+        expected = [
+            EmphasisNode(TextType.BOLD, [
+                TextNode('a', TextType.ITALIC),
+                TextNode(' b', TextType.TEXT),
+            ]),
+        ]
+        self.assertEqual(expected, created)
+
+    def test_triple_run_closes_two(self):
+        created = tokenize_inline('**c *d***')
+        expected = [
+            EmphasisNode(TextType.BOLD, [
+                TextNode('c ', TextType.TEXT),
+                TextNode('d', TextType.ITALIC),
+            ]),
+        ]
+        self.assertEqual(expected, created)
+
+    def test_code_and_link_inside_bold(self):
+        created = tokenize_inline('**run `make` or see [docs](/d)**')
+        expected = [
+            EmphasisNode(TextType.BOLD, [
+                TextNode('run ', TextType.TEXT),
+                TextNode('make', TextType.CODE),
+                TextNode(' or see ', TextType.TEXT),
+                TextNode('docs', TextType.LINK, url='/d'),
+            ]),
+        ]
+        self.assertEqual(expected, created)
+
+    def test_crossed_delimiters(self):
+        # The * opened inside the bold can't close once the bold has
+        created = tokenize_inline('**a *b** c*')
+        expected = [
+            TextNode('a *b', TextType.BOLD),
+            TextNode(' c*', TextType.TEXT),
+        ]
+        self.assertEqual(expected, created)
+
 class Test_markdown_to_blocks(unittest.TestCase):
     single_block = "This is a single block of text"
     multiple_block = "# This is a heading\n\nThis is a paragraph of text. It has some **bold** and *italic* words inside of it.\n\n* This is the first list item in a list block\n* This is a list item\n* This is another list item"
@@ -300,5 +468,196 @@ class Test_markdown_to_blocks(unittest.TestCase):
         expected = ['# This is a heading', 'This is a paragraph of text. It has some **bold** and *italic* words inside of it.', '* This is the first list item in a list block\n* This is a list item\n* This is another list item']
         self.assertEqual(expected, created)
 
+class Test_iter_markdown_blocks(unittest.TestCase):
+    documents = [
+        Test_markdown_to_blocks.single_block,
+        Test_markdown_to_blocks.multiple_block,
+        '',
+        '\n\n',
+        'a\n\n\nb\n\n\n\nc',
+        '  padded block  \n\n\tanother\n',
+        '# Heading\n\nPara with unicode \u00e9\u4e2d\n\n* list\n* items\n\n',
+    ]
+
+    def test_str(self):
+        for document in Test_iter_markdown_blocks.documents:
+            with self.subTest(document=document):
+                self.assertEqual(markdown_to_blocks(document), list(iter_markdown_blocks(document)))
+
+    def test_text_stream_small_chunks(self):
+        for document in Test_iter_markdown_blocks.documents:
+            for chunk_size in (1, 2, 3, 7):
+                with self.subTest(document=document, chunk_size=chunk_size):
+                    fp = io.StringIO(document)
+                    self.assertEqual(markdown_to_blocks(document), list(iter_markdown_blocks(fp, chunk_size)))
+
+    def test_binary_stream(self):
+        for document in Test_iter_markdown_blocks.documents:
+            with self.subTest(document=document):
+                fp = io.BytesIO(document.encode('utf-8'))
+                self.assertEqual(markdown_to_blocks(document), list(iter_markdown_blocks(fp, 2)))
+
+    def test_mmap(self):
+        document = Test_markdown_to_blocks.multiple_block
+        with tempfile.TemporaryFile() as fp:
+            fp.write(document.encode('utf-8'))
+            fp.flush()
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                self.assertEqual(markdown_to_blocks(document), list(iter_markdown_blocks(mapped)))
+
+    def test_is_lazy(self):
+        fp = io.StringIO('first\n\n' + 'x' * 100)
+        blocks = iter_markdown_blocks(fp, chunk_size=8)
+        self.assertEqual('first', next(blocks))
+        self.assertLess(fp.tell(), 100)
+
+    def test_long_block_small_chunks(self):
+        document = 'a\n\n' + 'line\n' * 50 + '\n\nb'
+        for chunk_size in (1, 4, 9):
+            with self.subTest(chunk_size=chunk_size):
+                fp = io.StringIO(document)
+                self.assertEqual(markdown_to_blocks(document), list(iter_markdown_blocks(fp, chunk_size)))
+
+class Test_iter_markdown_html(unittest.TestCase):
+    def test_matches_tree(self):
+        markdown = make_document(seed=1, blocks=40, nesting=2)
+        expected = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(expected, ''.join(iter_markdown_html(markdown)))
+        self.assertEqual(expected, ''.join(iter_markdown_html(io.StringIO(markdown), 64)))
+
+    def test_empty(self):
+        self.assertEqual(markdown_to_html_node('').to_html(), ''.join(iter_markdown_html('\n\n')))
+
+class Test_classify_block(unittest.TestCase):
+    cases = [
+        ('# Heading', BlockType.HEADING),
+        ('###### Heading', BlockType.HEADING),
+        ('####### Too deep', BlockType.PARAGRAPH),
+        ('### ###2 HEADER', BlockType.HEADING),
+        ('#NoSpace', BlockType.PARAGRAPH),
+        ('#', BlockType.PARAGRAPH),
+        ('```\ncode\n```', BlockType.CODE),
+        ('```\nunterminated', BlockType.PARAGRAPH),
+        ('> quote\n> more', BlockType.QUOTE),
+        ('> quote\nnot quote', BlockType.PARAGRAPH),
+        ('* item\n- item', BlockType.UNORDERED_LIST),
+        ('* item\n+ item', BlockType.PARAGRAPH),
+        ('-not a list', BlockType.PARAGRAPH),
+        ('1. one\n2. two\n3. three', BlockType.ORDERED_LIST),
+        ('1. one\n3. three', BlockType.PARAGRAPH),
+        ('2. two', BlockType.PARAGRAPH),
+        ('10 things', BlockType.PARAGRAPH),
+        ('Just a paragraph', BlockType.PARAGRAPH),
+        ('', BlockType.PARAGRAPH),
+    ]
+
+    def test_classify_block(self):
+        for block, expected in Test_classify_block.cases:
+            with self.subTest(block=block):
+                self.assertIs(expected, classify_block(block))
+
+    def test_classify_blocks(self):
+        blocks = [case[0] for case in Test_classify_block.cases]
+        expected = [case[1] for case in Test_classify_block.cases]
+        self.assertEqual(expected, classify_blocks(blocks))
+
+    def test_string_compat(self):
+        for block, expected in Test_classify_block.cases:
+            with self.subTest(block=block):
+                self.assertEqual(expected.value, block_to_block_type(block))
+
+    def test_ten_item_ordered_list(self):
+        block = '\n'.join(f'{number}. item {number}' for number in range(1, 11))
+        self.assertIs(BlockType.ORDERED_LIST, classify_block(block))
+        self.assertEqual('ORDERED_LIST', block_to_block_type(block))
+        html = markdown_to_html_node(block).to_html()
+        self.assertTrue(html.startswith('<div><ol><li>item 1</li>'))
+        self.assertTrue(html.endswith('<li>item 10</li></ol></div>'))
+        self.assertIs(BlockType.PARAGRAPH, classify_block(block.replace('10. ', '11. ')))
+
+    def test_long_ordered_list(self):
+        block = '\n'.join(f'{number}. item' for number in range(1, 151))
+        self.assertIs(BlockType.ORDERED_LIST, classify_block(block))
+
+class Test_markdown_to_html_node(unittest.TestCase):
+    def test_paragraphs(self):
+        md = "This is **bolded** paragraph\ntext in a p\ntag here\n\nThis is another paragraph with *italic* text and `code` here\n"
+        self.assertEqual(
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+            markdown_to_html_node(md).to_html()
+        )
+
+    def test_headings(self):
+        md = "# h1 with [link](url)\n\n###### h6"
+        self.assertEqual(
+            '<div><h1>h1 with <a href="url">link</a></h1><h6>h6</h6></div>',
+            markdown_to_html_node(md).to_html()
+        )
+
+    def test_code(self):
+        md = "```python\nThis is text that _should_ remain\nthe **same** even with inline stuff\n```"
+        self.assertEqual(
+            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
+            markdown_to_html_node(md).to_html()
+        )
+
+    def test_code_escaped(self):
+        md = "```\nif a < b && c:\n```"
+        self.assertEqual(
+            "<div><pre><code>if a &lt; b &amp;&amp; c:\n</code></pre></div>",
+            markdown_to_html_node(md).to_html()
+        )
+
+    def test_inline_escaped(self):
+        md = "1 < 2 is **[bold](/q?a=1&b=2)**"
+        self.assertEqual(
+            '<div><p>1 &lt; 2 is <b><a href="/q?a=1&amp;b=2">bold</a></b></p></div>',
+            markdown_to_html_node(md).to_html()
+        )
+
+    def test_link_escaped(self):
+        md = 'see [a "b"](/x?y=1&z=2)'
+        self.assertEqual(
+            '<div><p>see <a href="/x?y=1&amp;z=2">a "b"</a></p></div>',
+            markdown_to_html_node(md).to_html()
+        )
+
+    def test_nested_emphasis(self):
+        md = "*an **important** point*"
+        self.assertEqual(
+            "<div><p><i>an <b>important</b> point</i></p></div>",
+            markdown_to_html_node(md).to_html()
+        )
+
+    def test_quote(self):
+        md = "> This is a\n> blockquote with *style*"
+        self.assertEqual(
+            "<div><blockquote>This is a blockquote with <i>style</i></blockquote></div>",
+            markdown_to_html_node(md).to_html()
+        )
+
+    def test_lists(self):
+        md = "* one\n- **two**\n\n1. first\n2. second"
+        self.assertEqual(
+            "<div><ul><li>one</li><li><b>two</b></li></ul><ol><li>first</li><li>second</li></ol></div>",
+            markdown_to_html_node(md).to_html()
+        )
+
+    def test_empty(self):
+        self.assertEqual('<div></div>', markdown_to_html_node('').to_html())
+        self.assertEqual('<div><p>a</p><p>b</p></div>', markdown_to_html_node('a\n\n\n\nb').to_html())
+
+class Test_extract_title(unittest.TestCase):
+    def test_title(self):
+        self.assertEqual('Hello', extract_title('Intro\n# Hello \n## Sub'))
+
+    def test_title_from_file(self):
+        fp = io.StringIO('intro\n# Streamed \n\n' + 'body\n' * 100)
+        self.assertEqual('Streamed', extract_title(fp))
+        self.assertLess(fp.tell(), 100)
+
+    def test_no_title(self):
+        self.assertRaises(ValueError, extract_title, '## Not h1')
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
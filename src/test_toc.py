@@ -0,0 +1,117 @@
+import io
+import os
+import tempfile
+import unittest
+
+import rendercache
+import toc
+from build import can_stream, render_page, render_page_file, render_page_stream
+from textnode import markdown_to_html_node
+
+class TestHeadings(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual('hello-world', toc.slugify('Hello, World!'))
+        self.assertEqual('snake_case-and-dashes', toc.slugify('snake_case and -dashes'))
+        self.assertEqual('café-2', toc.slugify('Café #2'))
+        self.assertEqual('section', toc.slugify('?!'))
+
+    def test_unique_slugs(self):
+        headings = toc.Headings()
+        slugs = [headings.add(2, text) for text in ('Intro', 'Intro', 'Intro 1', 'Intro')]
+        self.assertEqual(['intro', 'intro-1', 'intro-1-1', 'intro-2'], slugs)
+
+    def test_nesting(self):
+        headings = toc.Headings()
+        for level, text in ((1, 'A'), (2, 'B'), (3, 'C'), (2, 'D'), (1, 'E'), (3, 'F')):
+            headings.add(level, text)
+        self.assertEqual(
+            '<ul><li><a href="#a">A</a><ul><li><a href="#b">B</a><ul><li><a href="#c">C</a></li></ul></li>'
+            '<li><a href="#d">D</a></li></ul></li>'
+            '<li><a href="#e">E</a><ul><li><a href="#f">F</a></li></ul></li></ul>',
+            headings.to_html()
+        )
+
+    def test_empty(self):
+        self.assertIsNone(toc.Headings().to_html_node())
+        self.assertEqual('', toc.Headings().to_html())
+
+class TestCollection(unittest.TestCase):
+    def tearDown(self):
+        toc.finish()
+        rendercache.disable()
+
+    def test_not_collecting(self):
+        self.assertEqual('<div><h1>Title</h1></div>', markdown_to_html_node('# Title').to_html())
+
+    def test_collects_in_render_pass(self):
+        toc.start()
+        html = markdown_to_html_node('# The *Title*\n\ntext\n\n## Usage & [links](/x)\n\n## Usage & [links](/x)').to_html()
+        headings = toc.finish()
+        self.assertEqual(
+            '<div><h1 id="the-title">The <i>Title</i></h1><p>text</p>'
+            '<h2 id="usage-links">Usage &amp; <a href="/x">links</a></h2>'
+            '<h2 id="usage-links-1">Usage &amp; <a href="/x">links</a></h2></div>',
+            html
+        )
+        self.assertEqual(
+            [(1, 'The Title', 'the-title'), (2, 'Usage & links', 'usage-links'), (2, 'Usage & links', 'usage-links-1')],
+            headings.entries
+        )
+        self.assertEqual(
+            '<ul><li><a href="#the-title">The Title</a><ul><li><a href="#usage-links">Usage &amp; links</a></li>'
+            '<li><a href="#usage-links-1">Usage &amp; links</a></li></ul></li></ul>',
+            headings.to_html()
+        )
+
+    def test_block_cache(self):
+        # Repeated headings stay unique even though their blocks are cached
+        rendercache.enable(8)
+        markdown = '## Notes\n\ntext\n\n## Notes'
+        markdown_to_html_node(markdown)
+        toc.start()
+        html = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(['notes', 'notes-1'], [slug for _, _, slug in toc.finish().entries])
+        self.assertEqual('<div><h2 id="notes">Notes</h2><p>text</p><h2 id="notes-1">Notes</h2></div>', html)
+        self.assertEqual('<div><h2>Notes</h2><p>text</p><h2>Notes</h2></div>', markdown_to_html_node(markdown).to_html())
+
+class TestPageToc(unittest.TestCase):
+    MARKDOWN = '# Page\n\n## One\n\ntext\n\n## Two'
+    TOC = '<ul><li><a href="#page">Page</a><ul><li><a href="#one">One</a></li><li><a href="#two">Two</a></li></ul></li></ul>'
+
+    def test_render_page(self):
+        html = render_page(self.MARKDOWN, '<nav>{{ TOC }}</nav>{{ Content }}')
+        self.assertEqual(f'<nav>{self.TOC}</nav><div><h1 id="page">Page</h1><h2 id="one">One</h2>'
+                         '<p>text</p><h2 id="two">Two</h2></div>', html)
+        self.assertIsNone(toc.current)
+
+    def test_streamed_page(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'page.md')
+            with open(path, 'w', encoding='utf-8') as fp:
+                fp.write(self.MARKDOWN)
+            after = io.StringIO()
+            render_page_stream(path, after, '{{ Content }}<nav>{{ TOC }}</nav>')
+            self.assertEqual(render_page(self.MARKDOWN, '{{ Content }}<nav>{{ TOC }}</nav>'), after.getvalue())
+            # Nothing has been rendered yet when the slot comes first
+            for template in ('<nav>{{ TOC }}</nav>{{ Content }}', '<nav>{{ TOC }}</nav>'):
+                with self.subTest(template=template):
+                    self.assertFalse(can_stream(template))
+                    with self.assertRaises(ValueError):
+                        render_page_stream(path, io.StringIO(), template)
+            self.assertIsNone(toc.current)
+
+    def test_toc_first_page_file(self):
+        # A page over the streaming threshold still gets its full TOC when
+        # the template lists it before the content
+        template = '<nav>{{ TOC }}</nav>{{ Content }}'
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'page.md')
+            with open(path, 'w', encoding='utf-8') as fp:
+                fp.write(self.MARKDOWN)
+            output_path = os.path.join(tmp, 'out', 'page.html')
+            render_page_file(path, output_path, template, stream=True)
+            with open(output_path, encoding='utf-8') as fp:
+                self.assertEqual(render_page(self.MARKDOWN, template), fp.read())
+
+if __name__ == '__main__':
+    unittest.main()
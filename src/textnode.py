@@ -1,6 +1,12 @@
 from enum import Enum
-from htmlnode import LeafNode
-import re
+from htmlnode import LeafNode, ParentNode, RawNode, SafeLeafNode
+import json
+import mmap
+
+import linkindex
+import rendercache
+import toc
+from lazyre import LazyPattern
 
 class TextType(Enum):
     TEXT = "text"
@@ -11,12 +17,16 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ('text', 'text_type', 'url')
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
         self.url = url
     
     def __eq__(self, other):
+        if not isinstance(other, TextNode):
+            return NotImplemented
         return (self.text == other.text) and (self.text_type == other.text_type) and (self.url == other.url)
     
     def __repr__(self):
@@ -25,20 +35,24 @@ class TextNode:
         else:
             return f'TextNode(text="{self.text}", text_type={self.text_type}, url="{self.url}")'
     
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, safe=False):
+    # safe: the text was checked to contain nothing that needs escaping
+    if type(text_node) is EmphasisNode:
+        return emphasis_to_html_node(text_node, safe, None)
+    leaf = SafeLeafNode if safe else LeafNode
     match text_node.text_type:
         case TextType.TEXT:
-            return LeafNode(tag=None, value=text_node.text)
+            return leaf(tag=None, value=text_node.text)
         case TextType.BOLD:
-            return LeafNode(tag='b', value=text_node.text)
+            return leaf(tag='b', value=text_node.text)
         case TextType.ITALIC:
-            return LeafNode(tag='i', value=text_node.text)
+            return leaf(tag='i', value=text_node.text)
         case TextType.CODE:
-            return LeafNode(tag='code', value=text_node.text)
+            return leaf(tag='code', value=text_node.text)
         case TextType.LINK:
-            return LeafNode(tag='a', value=text_node.text, props={'href': text_node.url})
+            return leaf._owned('a', text_node.text, props={'href': text_node.url})
         case TextType.IMAGE:
-            return LeafNode(tag='img', value='', props={'src': text_node.url, 'alt': text_node.text})
+            return leaf._owned('img', '', props={'src': text_node.url, 'alt': text_node.text})
         case _:
             raise ValueError('text_node has an unknown TextType')
 
@@ -60,51 +74,58 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         final_nodes.extend(process_node(node, delimiter, text_type))
     return final_nodes
 
+# The one pattern every link and image scanner uses, so splitting and
+# extracting always agree. A match preceded by ! is an image. The label
+# can't cross a bracket and the URL can't cross a paren, so a match attempt
+# from a [ stops at the next bracket and then the next paren. Any "](" that
+# could start a second URL scan ends the first one, so each character is
+# looked at a bounded number of times and a full scan is linear in the text.
+MARKDOWN_LINK = LazyPattern(r'\[([^\[\]]*)\]\(([^\(\)]*)\)')
+
+def iter_markdown_links(text):
+    # Yields (start, end, is_image, label, url) in order. A match ends in )
+    # so the ! before the next one can't be part of it.
+    for match in MARKDOWN_LINK.finditer(text):
+        start, end = match.span()
+        image = start > 0 and text[start - 1] == '!'
+        yield (start - 1 if image else start), end, image, match.group(1), match.group(2)
+
 def extract_markdown_images(text):
-    matches = re.findall(r'!\[([^\[\]]*)\]\(([^\(\)]*)\)', text)
-    return matches
+    return [(label, url) for _, _, image, label, url in iter_markdown_links(text) if image]
 
 def extract_markdown_links(text):
-    matches = re.findall(r'(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)', text)
-    return matches
-
-def process_node_regex(node, pattern, extract_func, text_type):
-    # TODO: Be a bit more proactive if text_type isn't text
-    new_nodes = []
-    split_text = re.split(pattern, node.text)
-    links = extract_func(node.text)
-    link_idx = 0
-    for idx, text in enumerate(split_text):
-        # Handle links at beginning/end
-        if (len(text) == 0) and (link_idx < len(links)):
-            new_nodes.append(TextNode(links[link_idx][0], text_type, url=links[link_idx][1]))
-            link_idx += 1
-            continue
-        # Handle original text and link if available
-        elif len(text) != 0:
-            new_nodes.append(TextNode(text, node.text_type, node.url))
-            if link_idx < len(links):
-                new_nodes.append(TextNode(links[link_idx][0], text_type, url=links[link_idx][1]))
-                link_idx += 1
-    return new_nodes
+    return [(label, url) for _, _, image, label, url in iter_markdown_links(text) if not image]
 
-def split_nodes_image(old_nodes):
-    pattern = r"!\[[^\[]*\)"
+def split_nodes_links(old_nodes, text_type):
+    # Splits out images or links, leaving the other kind in the text
+    want_image = text_type is TextType.IMAGE
     final_nodes = []
-
     for node in old_nodes:
-        final_nodes.extend(process_node_regex(node, pattern, extract_markdown_images, TextType.IMAGE))
+        if node.text_type is not TextType.TEXT:
+            # Already split out, e.g. an image with empty alt text
+            final_nodes.append(node)
+            continue
+        text = node.text
+        pos = 0
+        for start, end, image, label, url in iter_markdown_links(text):
+            if image != want_image:
+                continue
+            if pos < start:
+                final_nodes.append(TextNode(text[pos:start], TextType.TEXT))
+            final_nodes.append(TextNode(label, text_type, url))
+            pos = end
+        if pos < len(text):
+            final_nodes.append(TextNode(text[pos:], TextType.TEXT))
     return final_nodes
 
+def split_nodes_image(old_nodes):
+    return split_nodes_links(old_nodes, TextType.IMAGE)
+
 def split_nodes_link(old_nodes):
-    pattern = r"(?<!!)\[[^\[]*\)"
-    final_nodes = []
-        
-    for node in old_nodes:
-        final_nodes.extend(process_node_regex(node, pattern, extract_markdown_links, TextType.LINK))
-    return final_nodes
+    return split_nodes_links(old_nodes, TextType.LINK)
 
-def text_to_textnodes(text):
+def text_to_textnodes_multipass(text):
+    # Original five-pass pipeline, kept as the reference for tokenize_inline
     node = TextNode(text, TextType.TEXT)
     nodes = split_nodes_delimiter([node], '**', TextType.BOLD)
     nodes = split_nodes_delimiter(nodes, '*', TextType.ITALIC)
@@ -113,6 +134,198 @@ def text_to_textnodes(text):
     nodes = split_nodes_link(nodes)
     return nodes
 
+class EmphasisNode:
+    # Bold or italic text that wraps other inline nodes, e.g. a link or code
+    # span inside bold. Emphasis around plain text stays a single TextNode.
+    __slots__ = ('text_type', 'children')
+
+    def __init__(self, text_type, children):
+        self.text_type = text_type
+        self.children = children
+
+    def __eq__(self, other):
+        if not isinstance(other, EmphasisNode):
+            return NotImplemented
+        return (self.text_type == other.text_type) and (self.children == other.children)
+
+    def __repr__(self):
+        return f'EmphasisNode(text_type={self.text_type}, children={self.children})'
+
+INLINE_SPECIAL = LazyPattern(r'[*`\[!]')
+# Emphasis type by delimiter length
+EMPHASIS_TYPES = {1: TextType.ITALIC, 2: TextType.BOLD}
+
+def merge_text(nodes):
+    # Joins neighbouring TEXT nodes, e.g. a literal * left by an unmatched
+    # opener and the text around it
+    merged = []
+    for node in nodes:
+        if merged and node.text_type is TextType.TEXT and merged[-1].text_type is TextType.TEXT:
+            merged[-1] = TextNode(merged[-1].text + node.text, TextType.TEXT)
+        else:
+            merged.append(node)
+    return merged
+
+def opener_class(count):
+    # Openers are kept by run length: 1, 2, or 3 for longer runs, which can
+    # close as either and are split by the closers that actually arrive
+    return count if count < 3 else 3
+
+def close_emphasis(nodes, openers, index, size):
+    # Closes size stars (1 or 2) of the opener placeholder at nodes[index],
+    # taking the stars nearest the text so the rest of the run stays open
+    # around the new node
+    discarded = False
+    for stack in openers.values():
+        while stack and stack[-1] > index:
+            stack.pop()
+            discarded = True
+    count = len(nodes[index].text)
+    openers[opener_class(count)].pop()
+    children = nodes[index + 1:]
+    del nodes[index + 1:]
+    if discarded:
+        # Openers inside the closed span can't be closed any more, so they
+        # stay as the literal text already in children
+        children = merge_text(children)
+    remaining = count - size
+    if remaining:
+        nodes[index] = TextNode('*' * remaining, TextType.TEXT)
+        openers[opener_class(remaining)].append(index)
+    else:
+        del nodes[index]
+    text_type = EMPHASIS_TYPES[size]
+    if not children:
+        return
+    if len(children) == 1 and children[0].text_type is TextType.TEXT:
+        nodes.append(TextNode(children[0].text, text_type))
+    else:
+        nodes.append(EmphasisNode(text_type, children))
+
+def tokenize_inline(text):
+    # Single left-to-right scan. Code spans, links and images are matched
+    # where they start; runs of * go through a delimiter stack, so bold and
+    # italic can nest and each run is looked at once. Matches the multipass
+    # pipeline for well-formed, non-nested markup. Unmatched delimiters are
+    # kept as literal text.
+    nodes = []
+    # Positions in nodes of the literal placeholders for open runs of *, **
+    # and *** or more, by opener_class
+    openers = {1: [], 2: [], 3: []}
+    stacked = False
+    unclosed = set()
+    pending = 0
+    pos = 0
+    backticks = True
+    search = INLINE_SPECIAL.search
+    link_match = MARKDOWN_LINK.match
+    while True:
+        match = search(text, pos)
+        if match is None:
+            break
+        start = match.start()
+        char = text[start]
+        if char == '!' or char == '[':
+            if char == '!':
+                link = link_match(text, start + 1) if text.startswith('[', start + 1) else None
+                text_type = TextType.IMAGE
+            elif start > 0 and text[start - 1] == '!':
+                # Already tried as an image from the !
+                link = None
+            else:
+                link = link_match(text, start)
+                text_type = TextType.LINK
+            if link is None:
+                pos = start + 1
+                continue
+            if pending < start:
+                nodes.append(TextNode(text[pending:start], TextType.TEXT))
+            nodes.append(TextNode(link.group(1), text_type, url=link.group(2)))
+            pending = pos = link.end()
+            continue
+        if char == '`':
+            end = text.find('`', start + 1) if backticks else -1
+            if end == -1:
+                # No backtick later in the text, so never search again
+                backticks = False
+                pos = start + 1
+                continue
+            if pending < start:
+                nodes.append(TextNode(text[pending:start], TextType.TEXT))
+            if start + 1 < end:
+                nodes.append(TextNode(text[start + 1:end], TextType.CODE))
+            pending = pos = end + 1
+            continue
+        if pending < start:
+            nodes.append(TextNode(text[pending:start], TextType.TEXT))
+        pos = start + 1
+        while text.startswith('*', pos):
+            pos += 1
+        pending = pos
+        run = pos - start
+        if (run == 1 or run == 2) and not openers[run] and not openers[3] and run not in unclosed:
+            # Fast path for emphasis around plain text: the closer is the
+            # next special character and is a run of the same length
+            end = text.find(text[start:pos], pos)
+            if end == -1:
+                unclosed.add(run)
+            elif search(text, pos, end) is None and not text.startswith('*', end + run):
+                if pos < end:
+                    nodes.append(TextNode(text[pos:end], EMPHASIS_TYPES[run]))
+                pending = pos = end + run
+                continue
+        # A * only closes italic and a ** only closes bold, from the nearest
+        # opener that can give that many stars. Longer runs close the
+        # innermost open emphasis first, e.g. ***a*** is <b><i>a</i></b>.
+        while run:
+            index = -1
+            for count in ((run, 3) if run < 3 else (1, 2, 3)):
+                stack = openers[count]
+                if stack and stack[-1] > index:
+                    index = stack[-1]
+            if index == -1:
+                break
+            if run < 3:
+                size = run
+            else:
+                size = 2 if len(nodes[index].text) == 2 else 1
+            close_emphasis(nodes, openers, index, size)
+            run -= size
+        if run:
+            openers[opener_class(run)].append(len(nodes))
+            nodes.append(TextNode('*' * run, TextType.TEXT))
+            stacked = True
+    if pending < len(text):
+        nodes.append(TextNode(text[pending:], TextType.TEXT))
+    # Only placeholders from the stack can leave TEXT nodes side by side
+    return merge_text(nodes) if stacked else nodes
+
+def freeze_inline(nodes):
+    # Immutable copy of tokenize_inline output for the inline cache
+    return tuple(
+        (node.text_type, freeze_inline(node.children)) if type(node) is EmphasisNode
+        else (node.text, node.text_type, node.url)
+        for node in nodes
+    )
+
+def thaw_inline(frozen):
+    return [
+        EmphasisNode(fields[0], thaw_inline(fields[1])) if len(fields) == 2 else TextNode(*fields)
+        for fields in frozen
+    ]
+
+def text_to_textnodes(text):
+    cache = rendercache.inline_cache
+    if cache is None:
+        return tokenize_inline(text)
+    cached = cache.get(text)
+    if cached is None:
+        nodes = tokenize_inline(text)
+        cache.put(text, freeze_inline(nodes))
+        return nodes
+    # Fresh nodes on every hit so callers can't mutate the cached entry
+    return thaw_inline(cached)
+
 def markdown_to_blocks(markdown):
     blocks = markdown.split('\n\n')
     if not isinstance(blocks, list):
@@ -120,53 +333,293 @@ def markdown_to_blocks(markdown):
     blocks = [block.strip() for block in blocks]
     return blocks
 
-def block_to_block_type(block):
-    # Headings
-    if block[0] == '#':
-        try:
-            if block[0:block.index(' ') + 1] in [('#' * i) + ' ' for i in range(1, 7)]:
-                return 'HEADING'
-        except ValueError:
-            pass
-    # Code
-    if block[0:3] == '```' and block[-3:] == '```':
-        return 'CODE'
-    # Quote
-    if block[0:2] == '> ':
-        lines = block.splitlines()
-        if all(line[0:2] == '> ' for line in lines):
-            return 'QUOTE'
-    # Unordered list
-    if (block[0:2] == '* ') or (block[0:2] == '- '):
-        lines = block.splitlines()
-        if all((line[0:2] == '* ' or line[0:2] == '- ') for line in lines):
-            return 'UNORDERED_LIST'
-    # Ordered list
-    if block[0:3] == '1. ':
-        lines = block.splitlines()
-        pairs = list(enumerate(lines, start=1))
-        # Why doesn't this conditional break out to the else block?
-        if all(pair[1][0:3] == f'{pair[0]}. ' for pair in pairs):
-            return 'ORDERED_LIST'
+def iter_markdown_blocks(source, chunk_size=1 << 16):
+    # Lazy markdown_to_blocks: yields the same stripped blocks one at a time
+    # from a str, a text or binary file object, or an mmap. Only the block
+    # being assembled is held in memory.
+    if isinstance(source, str):
+        yield from iter_buffer_blocks(source)
+        return
+    if isinstance(source, mmap.mmap):
+        for block in iter_buffer_blocks(source):
+            yield block.decode('utf-8')
+        return
+    yield from iter_stream_blocks(source, chunk_size)
+
+def iter_buffer_blocks(buffer):
+    separator = '\n\n' if isinstance(buffer, str) else b'\n\n'
+    start = 0
+    while True:
+        end = buffer.find(separator, start)
+        if end == -1:
+            yield buffer[start:].strip()
+            return
+        yield buffer[start:end].strip()
+        start = end + 2
+
+def iter_stream_blocks(fp, chunk_size):
+    # Text of a long block is parked in pieces and joined once when the block
+    # ends, so a block spanning many chunks isn't re-copied on every read
+    pieces = []
+    pending = None
+    while True:
+        chunk = fp.read(chunk_size)
+        if pending is None:
+            pending = chunk[:0]
+            separator = '\n\n' if isinstance(chunk, str) else b'\n\n'
+        if not chunk:
+            break
+        pending += chunk
+        start = 0
+        # Back up one so a separator split across two chunks is still found
+        search = max(len(pending) - len(chunk) - 1, 0)
+        while True:
+            end = pending.find(separator, search)
+            if end == -1:
+                break
+            block = pending[start:end]
+            if pieces:
+                pieces.append(block)
+                block = block[:0].join(pieces)
+                pieces.clear()
+            yield decode_block(block.strip())
+            start = search = end + 2
+        # Keep only the last character, which may start a separator
+        if len(pending) - start > 1:
+            pieces.append(pending[start:-1])
+            pending = pending[-1:]
         else:
-            return 'PARAGRAPH'
-    else:
-        return 'PARAGRAPH'
+            pending = pending[start:]
+    pieces.append(pending)
+    yield decode_block(pending[:0].join(pieces).strip())
+
+def decode_block(block):
+    if isinstance(block, bytes):
+        return block.decode('utf-8')
+    return block
+
+
+class BlockType(Enum):
+    HEADING = 'HEADING'
+    CODE = 'CODE'
+    QUOTE = 'QUOTE'
+    UNORDERED_LIST = 'UNORDERED_LIST'
+    ORDERED_LIST = 'ORDERED_LIST'
+    PARAGRAPH = 'PARAGRAPH'
+
+ORDERED_LIST_PREFIXES = [f'{number}. ' for number in range(100)]
+
+def classify_heading(block):
+    level = block.find(' ')
+    if 1 <= level <= 6 and block.count('#', 0, level) == level:
+        return BlockType.HEADING
+    return BlockType.PARAGRAPH
+
+def classify_code(block):
+    if block.startswith('```') and block.endswith('```'):
+        return BlockType.CODE
+    return BlockType.PARAGRAPH
+
+def classify_quote(block):
+    if block.startswith('> ') and all(line.startswith('> ') for line in block.splitlines()):
+        return BlockType.QUOTE
+    return BlockType.PARAGRAPH
+
+def classify_unordered_list(block):
+    if block[1:2] == ' ' and all(line.startswith(('* ', '- ')) for line in block.splitlines()):
+        return BlockType.UNORDERED_LIST
+    return BlockType.PARAGRAPH
+
+def classify_ordered_list(block):
+    # Whole prefixes are compared, so '10. ' and later items count; the old
+    # three-character slice could never equal them and turned lists of ten
+    # or more items into paragraphs
+    if not block.startswith('1. '):
+        return BlockType.PARAGRAPH
+    prefixes = ORDERED_LIST_PREFIXES
+    for number, line in enumerate(block.splitlines(), start=1):
+        prefix = prefixes[number] if number < len(prefixes) else f'{number}. '
+        if not line.startswith(prefix):
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
+
+# Every block type is decided by its first character, so each block is
+# dispatched to at most one check
+BLOCK_CLASSIFIERS = {
+    '#': classify_heading,
+    '`': classify_code,
+    '>': classify_quote,
+    '*': classify_unordered_list,
+    '-': classify_unordered_list,
+    '1': classify_ordered_list,
+}
+
+def classify_block(block):
+    classifier = BLOCK_CLASSIFIERS.get(block[:1])
+    if classifier is None:
+        return BlockType.PARAGRAPH
+    return classifier(block)
+
+def classify_blocks(blocks):
+    get = BLOCK_CLASSIFIERS.get
+    paragraph = BlockType.PARAGRAPH
+    types = []
+    append = types.append
+    for block in blocks:
+        classifier = get(block[:1])
+        append(paragraph if classifier is None else classifier(block))
+    return types
+
+def block_to_block_type(block):
+    # String results kept for older callers; new code should use classify_block
+    return classify_block(block).value
     
+EMPHASIS_TAGS = {TextType.BOLD: 'b', TextType.ITALIC: 'i'}
+
+def emphasis_to_html_node(node, safe, links):
+    return ParentNode._owned(EMPHASIS_TAGS[node.text_type], inline_to_html_nodes(node.children, safe, links))
+
+def inline_to_html_nodes(nodes, safe, links):
+    children = []
+    for node in nodes:
+        if type(node) is EmphasisNode:
+            children.append(emphasis_to_html_node(node, safe, links))
+            continue
+        if links is not None and (node.text_type is TextType.LINK or node.text_type is TextType.IMAGE):
+            # Record link and image targets for the site index in the same pass
+            links[(node.text_type.value, node.url)] = None
+        children.append(text_node_to_html_node(node, safe))
+    return children
+
+def text_to_children(text):
+    nodes = text_to_textnodes(text)
+    # Every value and URL is cut from text, so one scan of it decides whether
+    # any leaf needs escaping
+    safe = '&' not in text and '<' not in text and '>' not in text and '"' not in text
+    children = inline_to_html_nodes(nodes, safe, linkindex.current)
+    if not children:
+        children.append(LeafNode(None, ''))
+    return children
+
+def plain_text(nodes):
+    # Text content of inline HTML nodes, without the markup
+    return ''.join(plain_text(node.children) if node.children else node.value for node in nodes)
+
+def heading_to_html_node(block):
+    level = block.index(' ')
+    children = text_to_children(block[level + 1:])
+    headings = toc.current
+    if headings is None:
+        return ParentNode._owned(f'h{level}', children)
+    # Collected for the table of contents in the same pass
+    slug = headings.add(level, plain_text(children).strip())
+    return ParentNode._owned(f'h{level}', children, {'id': slug})
+
+def code_to_html_node(block):
+    code = block[3:-3]
+    # Drop the opening fence line, which may carry a language name
+    newline = code.find('\n')
+    if newline != -1:
+        code = code[newline + 1:]
+    return ParentNode._owned('pre', [LeafNode(tag='code', value=code)])
+
+def quote_to_html_node(block):
+    lines = [line[1:].strip() for line in block.splitlines()]
+    return ParentNode._owned('blockquote', text_to_children(' '.join(lines)))
+
+def unordered_list_to_html_node(block):
+    items = [ParentNode._owned('li', text_to_children(line[2:])) for line in block.splitlines()]
+    return ParentNode._owned('ul', items)
+
+def ordered_list_to_html_node(block):
+    items = [
+        ParentNode._owned('li', text_to_children(line[line.index('. ') + 2:]))
+        for line in block.splitlines()
+    ]
+    return ParentNode._owned('ol', items)
+
+def paragraph_to_html_node(block):
+    return ParentNode._owned('p', text_to_children(' '.join(block.splitlines())))
+
+BLOCK_RENDERERS = {
+    BlockType.HEADING: heading_to_html_node,
+    BlockType.CODE: code_to_html_node,
+    BlockType.QUOTE: quote_to_html_node,
+    BlockType.UNORDERED_LIST: unordered_list_to_html_node,
+    BlockType.ORDERED_LIST: ordered_list_to_html_node,
+    BlockType.PARAGRAPH: paragraph_to_html_node,
+}
+
+def render_block_fragment(block, block_type):
+    # Renders one block to HTML, returning it with the links found in it so
+    # cached fragments can replay them into the link index
+    saved = linkindex.current
+    links = linkindex.current = {}
+    try:
+        html = BLOCK_RENDERERS[block_type](block).to_html()
+    finally:
+        linkindex.current = saved
+    return html, tuple(links)
+
+def encode_fragment(html, links):
+    return json.dumps(links) + '\n' + html
+
+def decode_fragment(data):
+    header, html = data.split('\n', 1)
+    return html, tuple(tuple(link) for link in json.loads(header))
+
+def block_to_html_node(block, block_type):
+    cache = rendercache.block_cache
+    disk = rendercache.disk_cache
+    if cache is None and disk is None or block_type is BlockType.HEADING and toc.current is not None:
+        # A heading's id depends on the headings before it on the page, so
+        # while they're collected it is rendered rather than cached
+        return BLOCK_RENDERERS[block_type](block)
+    key = (block_type, block)
+    fragment = cache.get(key) if cache is not None else None
+    if fragment is None:
+        data = disk.get(block, block_type.value) if disk is not None else None
+        if data is not None:
+            fragment = decode_fragment(data)
+        else:
+            fragment = render_block_fragment(block, block_type)
+            if disk is not None:
+                disk.put(block, block_type.value, encode_fragment(*fragment))
+        if cache is not None:
+            cache.put(key, fragment)
+    html, links = fragment
+    if links and linkindex.current is not None:
+        linkindex.current.update(dict.fromkeys(links))
+    return RawNode(html)
+
 def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    for block in blocks:
-        match block_to_block_type(block):
-            case 'HEADING':
-                pass
-            case 'QUOTE':
-                pass
-            case 'UNORDERED_LIST':
-                pass
-            case 'ORDERED_LIST':
-                pass
-            case 'PARAGRAPH':
-                pass
+    blocks = [block for block in markdown_to_blocks(markdown) if block]
+    children = [
+        block_to_html_node(block, block_type)
+        for block, block_type in zip(blocks, classify_blocks(blocks))
+    ]
+    if not children:
+        children.append(LeafNode(None, ''))
+    return ParentNode._owned('div', children)
+
+def iter_markdown_html(source, chunk_size=1 << 16):
+    # Streaming markdown_to_html_node(markdown).to_html(): each block is
+    # split, classified, rendered and serialized before the next is read, so
+    # only one block and its HTML are alive at a time. source is anything
+    # iter_markdown_blocks accepts.
+    yield '<div>'
+    for block in iter_markdown_blocks(source, chunk_size):
+        if block:
+            yield block_to_html_node(block, classify_block(block)).to_html()
+    yield '</div>'
+
+def extract_title(markdown):
+    # markdown may also be a text file, read only up to the title line
+    lines = markdown.splitlines() if isinstance(markdown, str) else markdown
+    for line in lines:
+        if line.startswith('# '):
+            return line[2:].strip()
+    raise ValueError('markdown has no h1 header')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,64 @@
+from htmlnode import LeafNode, ParentNode
+
+# Headings found while rendering the current page. None unless a caller
+# started collecting, in which case heading blocks also get id anchors;
+# rendering without a collector is unchanged and free.
+current = None
+
+def start():
+    global current
+    current = Headings()
+
+def finish():
+    global current
+    headings = current
+    current = None
+    return headings
+
+def slugify(text):
+    # Lowercased runs of letters, digits and '_', joined by '-'
+    words = ''.join(char if char.isalnum() or char == '_' else ' ' for char in text.lower()).split()
+    return '-'.join(words) or 'section'
+
+class Headings:
+    def __init__(self):
+        # (level, text, slug) in document order
+        self.entries = []
+        self.used = set()
+
+    def add(self, level, text):
+        # Returns a slug not used by any earlier heading on the page:
+        # 'intro', then 'intro-1', 'intro-2' and so on
+        base = slug = slugify(text)
+        suffix = 0
+        while slug in self.used:
+            suffix += 1
+            slug = f'{base}-{suffix}'
+        self.used.add(slug)
+        self.entries.append((level, text, slug))
+        return slug
+
+    def to_html_node(self):
+        # Nested lists of links to the headings, a deeper heading going in a
+        # list under the last shallower one. None for a page without any.
+        if not self.entries:
+            return None
+        node, _ = self.nest(0, min(level for level, _, _ in self.entries))
+        return node
+
+    def nest(self, index, level):
+        entries = self.entries
+        items = []
+        while index < len(entries) and entries[index][0] >= level:
+            entry_level, text, slug = entries[index]
+            children = [LeafNode('a', text, {'href': '#' + slug})]
+            index += 1
+            if index < len(entries) and entries[index][0] > entry_level:
+                sublist, index = self.nest(index, entry_level + 1)
+                children.append(sublist)
+            items.append(ParentNode._owned('li', children))
+        return ParentNode._owned('ul', items), index
+
+    def to_html(self):
+        node = self.to_html_node()
+        return node.to_html() if node is not None else ''